@@ -0,0 +1,231 @@
+"""Headless batch commands for reports and payroll.
+
+    python main.py payroll --month 09-2026 10-2026 --format csv pdf --out reports/
+    python main.py overtime --month 10-2026
+    python main.py daily --date 10-01-2026 10-02-2026
+    python main.py attendance --emp 1 2 3 --format pdf
+    python main.py import-employees --csv new_hires.csv
+    python main.py ingest-punches --file punches_10012026.csv
+    python main.py rebuild-totals --month 10-2026
+    python main.py migrate-attendance
+    python main.py compact-attendance --month 10-2026
+    python main.py archive-attendance
+    python main.py serve --port 8750
+    python main.py on-site
+    python main.py payroll-batch --month 01-2026 02-2026 --dept IT Finance --workers 4 --out reports/
+    python main.py payroll --month 10-2026 --format pdf --profile --profile-stats payroll.prof
+
+No prompts and no file dialogs: reports are written to --out as
+<report name>.<format>. Every command but import-employees, serve and on-site is HR
+only; the password is read from the QUICKHIRE_HR_PASSWORD environment
+variable, or asked for when run from a terminal. Every command takes
+--profile (see utils/profiling.py).
+"""
+import argparse
+import os
+import sys
+from getpass import getpass
+from config import HR_PASSWORD, HR_PASSWORD_ENV, DEPARTMENTS, PUNCH_SERVICE_HOST, PUNCH_SERVICE_PORT
+from utils import profiling
+
+
+def _month(value):
+    if len(value) != 7 or value[2] != '-':
+        raise argparse.ArgumentTypeError(f"invalid month {value!r}, use MM-YYYY")
+    return value
+
+
+def _date(value):
+    if len(value) != 10 or value[2] != '-' or value[5] != '-':
+        raise argparse.ArgumentTypeError(f"invalid date {value!r}, use MM-DD-YYYY")
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py", description="QuickHire batch reports (HR only)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    # command -> (option, value type, help)
+    options = {
+        "payroll": ("--month", _month, "monthly payroll for one or more months (MM-YYYY)"),
+        "overtime": ("--month", _month, "overtime report for one or more months (MM-YYYY)"),
+        "daily": ("--date", _date, "daily attendance summary for one or more dates (MM-DD-YYYY)"),
+        "attendance": ("--emp", int, "attendance history for one or more employee IDs"),
+    }
+    for name, (option, value_type, help_text) in options.items():
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument(option, dest="values", metavar=option[2:].upper(), type=value_type,
+                             nargs="+", required=True)
+        command.add_argument("--format", nargs="+", choices=("csv", "pdf"), default=["csv"],
+                             help="output format(s), default csv")
+        command.add_argument("--out", default=None, help="output directory, default reports/")
+
+    command = commands.add_parser("import-employees", help="register employees from a CSV "
+                                  "(name, department, role, rate, contact)")
+    command.add_argument("--csv", required=True, help="CSV file to import")
+
+    command = commands.add_parser("ingest-punches", help="merge time-clock punch files into attendance")
+    command.add_argument("--file", dest="files", nargs="+", required=True,
+                         help="CSV (emp_id, time, type) or JSON Lines punch file(s)")
+
+    command = commands.add_parser("rebuild-totals", help="regenerate the monthly payroll totals from attendance "
+                                  "and report any that were wrong")
+    command.add_argument("--month", dest="values", metavar="MONTH", type=_month, nargs="+", default=None,
+                         help="months to rebuild (MM-YYYY), default all")
+
+    command = commands.add_parser("serve", help="run the local HTTP punch service for sign-in kiosks")
+    command.add_argument("--host", default=PUNCH_SERVICE_HOST, help=f"default {PUNCH_SERVICE_HOST}")
+    command.add_argument("--port", type=int, default=PUNCH_SERVICE_PORT, help=f"default {PUNCH_SERVICE_PORT}")
+
+    command = commands.add_parser("compact-attendance", help="fold attendance journals into their month "
+                                  "snapshots now, instead of waiting for the size/age threshold")
+    command.add_argument("--month", dest="values", metavar="MONTH", type=_month, nargs="+", default=None,
+                         help="months to compact (MM-YYYY), default all")
+
+    commands.add_parser("archive-attendance", help="write attendance to the fixed-width binary archive "
+                        "that reports and history read unchanged months from")
+
+    commands.add_parser("on-site", help="who is signed in today and not yet signed out")
+
+    commands.add_parser("migrate-attendance", help="convert attendance stored with formatted dates and "
+                        "times to day ordinals and epoch seconds (one-shot)")
+
+    command = commands.add_parser("payroll-batch", help="consolidated payroll for many months and/or "
+                                  "departments, computed in parallel")
+    command.add_argument("--month", dest="months", metavar="MONTH", type=_month, nargs="+", required=True)
+    command.add_argument("--dept", dest="departments", metavar="DEPT", nargs="+", choices=list(DEPARTMENTS),
+                         help="departments, default all in one line per month")
+    command.add_argument("--workers", type=int, default=None, help="worker processes, default one per CPU")
+    command.add_argument("--out", default=None, help="also write every employee line to DIR/payroll_batch.csv")
+
+    for command in commands.choices.values():
+        profiling.add_arguments(command)
+    return parser
+
+
+def _authorized():
+    """Check the HR password from the environment, or prompt when interactive"""
+    password = os.environ.get(HR_PASSWORD_ENV)
+    if password is None:
+        if not sys.stdin.isatty():
+            print(f"Set {HR_PASSWORD_ENV} to run reports non-interactively.", file=sys.stderr)
+            return False
+        password = getpass("Enter HR Password: ")
+    if password != HR_PASSWORD:
+        print("Access denied! For HR only!", file=sys.stderr)
+        return False
+    return True
+
+
+def run(argv):
+    """Run one batch command; returns the process exit code"""
+    args = build_parser().parse_args(argv)
+    with profiling.session(args):
+        return _run(args)
+
+
+def _run(args):
+    if args.command == "import-employees":
+        from services.employee_service import import_employees_csv
+        try:
+            _, errors = import_employees_csv(args.csv)
+        except OSError as e:
+            print(f"Cannot read {args.csv}: {e.strerror}", file=sys.stderr)
+            return 1
+        return 1 if errors else 0
+
+    if args.command == "serve":
+        from services.punch_service import serve
+        serve(args.host, args.port)
+        return 0
+
+    if args.command == "on-site":
+        from services.attendance_service import show_on_site
+        show_on_site()
+        return 0
+
+    if not _authorized():
+        return 2
+
+    if args.command == "ingest-punches":
+        from services.attendance_service import ingest_punches
+        failed = 0
+        for path in args.files:
+            try:
+                _, errors = ingest_punches(path)
+            except OSError as e:
+                print(f"Cannot read {path}: {e.strerror}", file=sys.stderr)
+                errors = True
+            failed += bool(errors)
+        return 1 if failed else 0
+
+    if args.command == "migrate-attendance":
+        from utils.storage import get_repository
+        count = get_repository().migrate_attendance()
+        print(f"{count} attendance records stored as day ordinals and epoch seconds")
+        return 0
+
+    if args.command == "compact-attendance":
+        from utils.storage import get_repository
+        for name, folded in get_repository().compact_attendance(args.values).items():
+            print(f"{name}: " + ("skipped, being compacted by another process" if folded is None
+                                 else f"{folded} journal bytes folded"))
+        return 0
+
+    if args.command == "archive-attendance":
+        from utils.storage import get_repository
+        archived, skipped = get_repository().archive_attendance()
+        print(f"{archived} months archived")
+        if skipped:
+            print(f"Left in JSON (hours with more than two decimals): {', '.join(skipped)}")
+        return 0
+
+    if args.command == "payroll-batch":
+        return _payroll_batch(args)
+
+    if args.command == "rebuild-totals":
+        from services.payroll_service import rebuild_payroll_totals
+        return 1 if rebuild_payroll_totals(args.values) else 0
+
+    from services import report_service
+
+    builders = {
+        "payroll": report_service.build_monthly_payroll_report,
+        "overtime": report_service.build_overtime_report,
+        "daily": report_service.build_daily_attendance_report,
+        "attendance": report_service.build_attendance_history_report,
+    }
+    build = builders[args.command]
+
+    failed = 0
+    for value in args.values:
+        report = build(value)
+        if report is None:
+            failed += 1
+            continue
+        for file_format in args.format:
+            print(report_service.write_report(report, file_format, args.out))
+
+    return 1 if failed else 0
+
+
+def _payroll_batch(args):
+    from services.payroll_service import run_payroll_batch, print_batch_summary
+    from utils.export_helpers import save_csv
+
+    results = run_payroll_batch(args.months, args.departments, args.workers)
+    if any(rows is None for _, _, rows in results):
+        print("Payroll inputs not found! Please prepare payroll first.", file=sys.stderr)
+        return 1
+
+    print_batch_summary(results)
+    if args.out:
+        fieldnames = ["month", "dept", "id", "name", "rate", "reg_hrs", "ot_hrs",
+                      "allowance", "deduction", "gross", "net"]
+        rows = (row for _, _, month_rows in results for row in month_rows)
+        print(save_csv(os.path.join(args.out, "payroll_batch.csv"), fieldnames, rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(sys.argv[1:]))
\ No newline at end of file
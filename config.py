@@ -1,14 +1,64 @@
+# Storage backend: "json" (files below) or "sqlite" (SQLITE_FILE)
+STORAGE_BACKEND = "json"
+SQLITE_FILE = "quickhire.db"
+
 # File paths
 EMPLOYEE_FILE = "employees.json"
+PAYROLL_INPUTS_FILE = "payroll_inputs.json"
+ATTENDANCE_DIR = "attendance"
+# Fixed-width binary copy of attendance (python main.py archive-attendance), read in place
+# of the month JSON files that have not changed since it was built
+ATTENDANCE_ARCHIVE_FILE = "attendance.bin"
+
+# Format save_data writes data files in: "json" (compact), "pretty" (indented JSON),
+# "jsonl" (a list one item per line), "marshal" or "msgpack" (binary, needs msgpack
+# installed). Files in any of these are read regardless; tools/convert_data.py converts.
+DATA_FORMAT = "json"
+
+# Parsed data files each process keeps in memory, least recently used evicted first.
+# Counted by file size (the parsed data takes a few times that); 0 turns the cache off.
+DATA_CACHE_BYTES = 64_000_000
+
+# Who is clocked in: each employee's latest day and open sign-in, kept beside the
+# attendance history so a punch does not have to load it
+OPEN_SESSIONS_FILE = "open_sessions.json"
+
+# Single-file attendance from older versions, migrated into ATTENDANCE_DIR
 ATTENDANCE_FILE = "attendance.json"
+ATTENDANCE_JOURNAL_FILE = "attendance_journal.jsonl"
 
 # HR credentials
 HR_PASSWORD = "admin_123"
+# Environment variable the batch CLI reads the HR password from
+HR_PASSWORD_ENV = "QUICKHIRE_HR_PASSWORD"
 
 # Date format
 DATE_FORMAT = "%m-%d-%Y"
 DATETIME_FORMAT = "%m-%d-%Y %H:%M:%S"
 
+# Import-time budget for the kiosk sign-in path (checked by tools/check_startup.py)
+STARTUP_BUDGET_MS = 100
+
+# A month's attendance journal is folded into its snapshot once it grows past
+# this size, or when the snapshot is older than this (python main.py compact-attendance)
+JOURNAL_COMPACT_BYTES = 1_000_000
+JOURNAL_COMPACT_AGE_HOURS = 24
+
+# Kiosk punches arriving within this window are committed in one write (services/attendance_writer.py)
+GROUP_COMMIT_WINDOW_MS = 20
+GROUP_COMMIT_MAX_BATCH = 500
+
+# Local HTTP punch service for kiosks (python main.py serve)
+PUNCH_SERVICE_HOST = "127.0.0.1"
+PUNCH_SERVICE_PORT = 8750
+
+# Computed payroll results kept on disk, least recently used evicted first
+PAYROLL_CACHE_DIR = "payroll_cache"
+PAYROLL_CACHE_ENTRIES = 24
+
+# Worker processes for multi-month payroll runs (None: one per CPU)
+PAYROLL_WORKERS = None
+
 # Work hours
 REGULAR_HOURS_PER_DAY = 8
 OVERTIME_MULTIPLIER = 1.5
@@ -1,12 +1,29 @@
-from services.employee_service import register_employee, edit_employee, delete_employee, list_employees
-from services.attendance_service import sign_in, sign_out, edit_attendance
-from services.payroll_service import generate_payroll, generate_individual_payslip, prepare_payroll_inputs
-from services.report_service import (
-    export_monthly_payroll,
-    export_individual_attendance,
-    export_overtime_report,
-    export_daily_attendance_summary
-)
+import sys
+from importlib import import_module
+from utils import profiling
+
+# Menu option -> (service module, function). Service modules are imported
+# the first time one of their options is chosen, so a sign-in never loads
+# the report and export code.
+MENU_ACTIONS = {
+    1: ("services.employee_service", "register_employee"),
+    2: ("services.employee_service", "edit_employee"),
+    3: ("services.employee_service", "delete_employee"),
+    4: ("services.employee_service", "list_employees"),
+    5: ("services.attendance_service", "sign_in"),
+    6: ("services.attendance_service", "sign_out"),
+    7: ("services.attendance_service", "edit_attendance"),
+    8: ("services.payroll_service", "prepare_payroll_inputs"),
+    9: ("services.payroll_service", "generate_individual_payslip"),
+    10: ("services.payroll_service", "generate_payroll"),
+    11: ("services.report_service", "export_monthly_payroll"),
+    12: ("services.report_service", "export_individual_attendance"),
+    13: ("services.report_service", "export_overtime_report"),
+    14: ("services.report_service", "export_daily_attendance_summary"),
+    15: ("services.employee_service", "import_employees"),
+    16: ("services.attendance_service", "import_punches"),
+    17: ("services.attendance_service", "show_on_site"),
+}
 
 def display_menu():
     print("""
@@ -34,10 +51,25 @@ def display_menu():
 13. Export Overtime Report CSV (HR Only!)
 14. Export Daily Attendance Summary CSV (HR Only!)
           
+===============================
+    Imports and Headcount
+===============================
+          
+15. Import Employees from CSV
+16. Import Time-Clock Punches (HR Only!)
+17. Who Is On Site
+          
 0. Exit
 """)
 
 
+def run_action(choice):
+    """Import the service behind a menu option on demand and run it"""
+    module_name, function_name = MENU_ACTIONS[choice]
+    with profiling.stage(f"menu {function_name}"):
+        getattr(import_module(module_name), function_name)()
+
+
 def main():
     """Main application loop"""
     while True:
@@ -49,40 +81,27 @@ def main():
             print("Invalid input! Please enter a number.")
             continue
         
-        if choice == 1:
-            register_employee()
-        elif choice == 2:
-            edit_employee()
-        elif choice == 3:
-            delete_employee()
-        elif choice == 4:
-            list_employees()
-        elif choice == 5:
-            sign_in()
-        elif choice == 6:
-            sign_out()
-        elif choice == 7:
-            edit_attendance()
-        elif choice == 8:
-            prepare_payroll_inputs()
-        elif choice == 9:
-            generate_individual_payslip()
-        elif choice == 10:
-            generate_payroll()
-        elif choice == 11:
-            export_monthly_payroll()
-        elif choice == 12:
-            export_individual_attendance()
-        elif choice == 13:
-            export_overtime_report()
-        elif choice == 14:
-            export_daily_attendance_summary()
+        if choice in MENU_ACTIONS:
+            run_action(choice)
         elif choice == 0:
             print("Thank you for using QuickHire Services!")
             break
         else:
-            print("Invalid option! Please select 1-15, or 0 to Exit.")
+            print("Invalid option! Please select 1-17, or 0 to Exit.")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1 and not sys.argv[1].startswith("--profile"):
+        # Batch mode: python main.py <command> ... (see cli.py)
+        from cli import run
+        sys.exit(run(sys.argv[1:]))
+
+    if len(sys.argv) > 1:
+        # Menu with a per-stage breakdown on exit: python main.py --profile
+        from argparse import ArgumentParser
+        parser = ArgumentParser(prog="main.py", description="QuickHire menu (batch commands: python main.py -h)")
+        profiling.add_arguments(parser)
+        with profiling.session(parser.parse_args()):
+            main()
+    else:
+        main()
\ No newline at end of file
@@ -1,6 +1,17 @@
+from array import array
+from datetime import date, datetime
+
+# Column value for a missing sign-in/sign-out time
+NO_TIME = -1
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
 class Employee:
     """Employee class to represent employee data"""
-    
+
+    __slots__ = ("emp_id", "name", "role", "dept", "rate", "contact")
+
     def __init__(self, emp_id, name, role, dept, rate, contact):
         self.emp_id = emp_id
         self.name = name
@@ -8,7 +19,7 @@ class Employee:
         self.dept = dept
         self.rate = rate
         self.contact = contact
-    
+
     def to_dict(self):
         """Convert employee object to dictionary"""
         return {
@@ -19,7 +30,7 @@ class Employee:
             "rate": self.rate,
             "contact": self.contact
         }
-    
+
     @classmethod
     def from_dict(cls, data):
         """Create employee object from dictionary"""
@@ -30,4 +41,143 @@ class Employee:
             data["dept"],
             data["rate"],
             data["contact"]
-        )
\ No newline at end of file
+        )
+
+
+class AttendanceRecord:
+    """One sign-in/sign-out of an employee on a day.
+
+    day is a day ordinal and sign_in/sign_out are epoch seconds (None when
+    missing); they are formatted as MM-DD-YYYY strings only for display.
+    """
+
+    __slots__ = ("emp_id", "day", "sign_in", "sign_out", "hours")
+
+    def __init__(self, emp_id, day, sign_in, sign_out=None, hours=0.0):
+        self.emp_id = emp_id
+        self.day = day
+        self.sign_in = sign_in
+        self.sign_out = sign_out
+        self.hours = hours
+
+    @property
+    def date(self):
+        """The day as MM-DD-YYYY"""
+        return ordinal_date(self.day)
+
+    def to_dict(self):
+        """Convert attendance record to dictionary"""
+        return {
+            "emp_id": self.emp_id,
+            "day": self.day,
+            "sign_in": self.sign_in,
+            "sign_out": self.sign_out,
+            "hours": self.hours
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create attendance record from dictionary, including ones stored with date/time strings"""
+        if "day" not in data:
+            data = upgrade_attendance(data)
+        return cls(
+            data["emp_id"],
+            data["day"],
+            data.get("sign_in"),
+            data.get("sign_out"),
+            data.get("hours", 0.0)
+        )
+
+
+def upgrade_attendance(data):
+    """Copy of an attendance record or event stored with a MM-DD-YYYY date and
+    formatted times, with the day ordinal and epoch seconds instead"""
+    data = dict(data)
+    data["day"] = date_ordinal(data.pop("date"))
+    for field in ("sign_in", "sign_out"):
+        if field in data:
+            data[field] = datetime_epoch(data[field])
+    return data
+
+
+def date_ordinal(date_str):
+    """Day ordinal of a MM-DD-YYYY date"""
+    return date(int(date_str[6:10]), int(date_str[:2]), int(date_str[3:5])).toordinal()
+
+
+def ordinal_date(day):
+    """MM-DD-YYYY date of a day ordinal"""
+    d = date.fromordinal(day)
+    return f"{d.month:02d}-{d.day:02d}-{d.year:04d}"
+
+
+def datetime_epoch(datetime_str):
+    """Seconds since 1970-01-01 of a MM-DD-YYYY HH:MM:SS time (wall clock), None if missing"""
+    if not datetime_str:
+        return None
+    seconds = int(datetime_str[11:13]) * 3600 + int(datetime_str[14:16]) * 60 + int(datetime_str[17:19])
+    return (date_ordinal(datetime_str) - _EPOCH_ORDINAL) * 86400 + seconds
+
+
+def epoch_datetime(seconds):
+    """MM-DD-YYYY HH:MM:SS time of seconds since 1970-01-01, None if missing"""
+    if seconds is None or seconds == NO_TIME:
+        return None
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"{ordinal_date(days + _EPOCH_ORDINAL)} {hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def to_epoch(moment):
+    """Seconds since 1970-01-01 of a datetime (wall clock)"""
+    return (moment.toordinal() - _EPOCH_ORDINAL) * 86400 + moment.hour * 3600 + moment.minute * 60 + moment.second
+
+
+def now_epoch():
+    """Seconds since 1970-01-01 of the current wall-clock time"""
+    return to_epoch(datetime.now())
+
+
+def epoch_day(seconds):
+    """Day ordinal of seconds since 1970-01-01"""
+    return seconds // 86400 + _EPOCH_ORDINAL
+
+
+class AttendanceColumns:
+    """Attendance as parallel arrays: emp_id, day ordinal, sign-in/out epoch seconds and hours.
+
+    About 32 bytes a row instead of a record object per row; iterating
+    yields (emp_id, day, sign_in, sign_out, hours) tuples.
+    """
+
+    __slots__ = ("emp_id", "day", "sign_in", "sign_out", "hours")
+
+    def __init__(self):
+        self.emp_id = array("i")
+        self.day = array("i")
+        self.sign_in = array("q")
+        self.sign_out = array("q")
+        self.hours = array("d")
+
+    @classmethod
+    def from_records(cls, records):
+        """Build the columns from AttendanceRecord objects"""
+        columns = cls()
+        for record in records:
+            columns.append(record.emp_id, record.day, record.sign_in, record.sign_out, record.hours)
+        return columns
+
+    def append(self, emp_id, day, sign_in, sign_out, hours):
+        """Append one row as stored (None for a missing time)"""
+        self.emp_id.append(emp_id)
+        self.day.append(day)
+        self.sign_in.append(NO_TIME if sign_in is None else sign_in)
+        self.sign_out.append(NO_TIME if sign_out is None else sign_out)
+        self.hours.append(float(hours or 0))
+
+    def __len__(self):
+        return len(self.emp_id)
+
+    def __iter__(self):
+        return zip(self.emp_id, self.day, self.sign_in, self.sign_out, self.hours)
\ No newline at end of file
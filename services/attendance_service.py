@@ -1,69 +1,77 @@
+import csv
+import json
+import time
 from datetime import datetime
-from utils.data_handler import load_data, save_data
+from models import date_ordinal, ordinal_date, epoch_datetime, epoch_day, now_epoch, to_epoch
+from utils.attendance_store import partition_for_day
+from utils.storage import get_repository
 from utils.security import verify_hr_access
-from config import ATTENDANCE_FILE, DATE_FORMAT, DATETIME_FORMAT, HR_PASSWORD
+from config import DATETIME_FORMAT, HR_PASSWORD
 
 
 def sign_in():
     """Sign in an employee"""
-    attendance = load_data(ATTENDANCE_FILE)
-    
-    try:
-        emp_id = int(input("Enter Employee ID: "))
-    except ValueError:
-        print("Invalid Employee ID!")
-        return
-    
-    today = datetime.now().strftime(DATE_FORMAT)
-    
-    # Check if already signed in
-    for entry in attendance:
-        if entry["emp_id"] == emp_id and entry["date"] == today and not entry.get("sign_out"):
-            print("Already signed in today!")
-            return
-    
-    sign_in_time = datetime.now().strftime(DATETIME_FORMAT)
-    new_entry = {
-        "emp_id": emp_id,
-        "date": today,
-        "sign_in": sign_in_time,
-        "sign_out": None,
-        "hours": 0.0
-    }
-    
-    attendance.append(new_entry)
-    save_data(ATTENDANCE_FILE, attendance)
-    print("Signed in successfully!")
+    _punch_from_menu("in")
 
 
 def sign_out():
     """Sign out an employee"""
-    attendance = load_data(ATTENDANCE_FILE)
-    
+    _punch_from_menu("out")
+
+
+def _punch_from_menu(punch_type):
     try:
         emp_id = int(input("Enter Employee ID: "))
     except ValueError:
         print("Invalid Employee ID!")
         return
     
-    today = datetime.now().strftime(DATE_FORMAT)
+    now = now_epoch()
+    with get_repository().punch_sessions() as sessions:
+        event, message = punch_event(sessions, emp_id, punch_type, now)
+        if event:
+            sessions.record(event)
+    print(message)
+
+
+def punch_event(attendance, emp_id, punch_type, now):
+    """
+    The event for an "in" or "out" punch at now (epoch seconds), checked against attendance
+    (an AttendanceStore or the repository's OpenSessions). Returns (event, message);
+    event is None when the punch is refused and message says why.
+    """
+    today = epoch_day(now)
+    entry = attendance.find_open(emp_id, today)
     
-    for entry in attendance:
-        if entry["emp_id"] == emp_id and entry["date"] == today and not entry.get("sign_out"):
-            sign_out_time = datetime.now().strftime(DATETIME_FORMAT)
-            entry["sign_out"] = sign_out_time
-            
-            # Calculate hours
-            in_time = datetime.strptime(entry["sign_in"], DATETIME_FORMAT)
-            out_time = datetime.strptime(sign_out_time, DATETIME_FORMAT)
-            hours = (out_time - in_time).total_seconds() / 3600
-            entry["hours"] = round(hours, 2)
-            
-            save_data(ATTENDANCE_FILE, attendance)
-            print(f"Signed out! Hours today: {entry['hours']}")
-            return
+    if punch_type == "in":
+        # Check if already signed in
+        if entry:
+            return None, "Already signed in today!"
+        return {"op": "sign_in", "emp_id": emp_id, "day": today, "sign_in": now}, "Signed in successfully!"
     
-    print("No sign-in found for today!")
+    if not entry:
+        return None, "No sign-in found for today!"
+    hours = _worked_hours(entry.sign_in, now)
+    return ({"op": "sign_out", "emp_id": emp_id, "day": today, "sign_out": now, "hours": hours},
+            f"Signed out! Hours today: {hours}")
+
+
+def show_on_site():
+    """Print everyone signed in today and not yet signed out, for floor supervisors"""
+    repo = get_repository()
+    today = epoch_day(now_epoch())
+    on_site = repo.open_sessions().on_site(today)
+    print(f"\nOn site {ordinal_date(today)}: {len(on_site)}")
+    if not on_site:
+        return
+    names = {emp.emp_id: emp.name for emp in repo.load_employees()}
+    for emp_id, sign_in in sorted(on_site.items(), key=lambda item: item[1]):
+        print(f"  {emp_id:<6} {names.get(emp_id, '(unknown)'):<28} since {epoch_datetime(sign_in)}")
+
+
+def _worked_hours(sign_in_time, sign_out_time):
+    """Hours between a sign-in and a sign-out (epoch seconds), rounded to 2 decimals"""
+    return round((sign_out_time - sign_in_time) / 3600, 2)
 
 
 def edit_attendance():
@@ -76,8 +84,6 @@ def edit_attendance():
         print("Access denied! For HR only!")
         return
     
-    attendance = load_data(ATTENDANCE_FILE)
-    
     try:
         emp_id = int(input("Enter Employee ID: "))
     except ValueError:
@@ -85,44 +91,198 @@ def edit_attendance():
         return
     
     date = input("Date [MM-DD-YYYY]: ")
+    try:
+        day = date_ordinal(date)
+    except ValueError:
+        print("Entry not found.")
+        return
+    attendance = get_repository().load_attendance([partition_for_day(day)])
     
-    for entry in attendance:
-        if entry["emp_id"] == emp_id and entry["date"] == date:
-            print(f"\nCurrent: In {entry['sign_in']}, Out {entry['sign_out']}, Hours {entry['hours']}")
-            
-            new_signin = input("New Sign-In [MM-DD-YYYY HH:MM:SS] or press Enter to skip: ")
-            if new_signin:
-                try:
-                    datetime.strptime(new_signin, DATETIME_FORMAT)
-                    entry["sign_in"] = new_signin
-                except ValueError:
-                    print("Invalid format! Keeping old sign-in time.")
-            
-            new_signout = input("New Sign-Out [MM-DD-YYYY HH:MM:SS] or press Enter to skip: ")
-            if new_signout:
-                try:
-                    datetime.strptime(new_signout, DATETIME_FORMAT)
-                    entry["sign_out"] = new_signout
-                except ValueError:
-                    print("Invalid format! Keeping old sign-out time.")
-            
-            # Recalculate hours if both times are present
-            if entry["sign_in"] and entry["sign_out"]:
+    entry = attendance.find(emp_id, day)
+    if not entry:
+        print("Entry not found.")
+        return
+    
+    print(f"\nCurrent: In {epoch_datetime(entry.sign_in)}, Out {epoch_datetime(entry.sign_out)}, Hours {entry.hours}")
+    sign_in_time = entry.sign_in
+    sign_out_time = entry.sign_out
+    hours = entry.hours
+    
+    new_signin = input("New Sign-In [MM-DD-YYYY HH:MM:SS] or press Enter to skip: ")
+    if new_signin:
+        try:
+            sign_in_time = to_epoch(datetime.strptime(new_signin, DATETIME_FORMAT))
+        except ValueError:
+            print("Invalid format! Keeping old sign-in time.")
+    
+    new_signout = input("New Sign-Out [MM-DD-YYYY HH:MM:SS] or press Enter to skip: ")
+    if new_signout:
+        try:
+            sign_out_time = to_epoch(datetime.strptime(new_signout, DATETIME_FORMAT))
+        except ValueError:
+            print("Invalid format! Keeping old sign-out time.")
+    
+    # Recalculate hours if both times are present
+    if sign_in_time is not None and sign_out_time is not None:
+        if sign_out_time > sign_in_time:
+            hours = _worked_hours(sign_in_time, sign_out_time)
+            print(f"Updated hours: {hours}")
+        else:
+            print("Warning: Out time must be after in time.")
+    
+    attendance.record({
+        "op": "edit",
+        "emp_id": emp_id,
+        "day": day,
+        "sign_in": sign_in_time,
+        "sign_out": sign_out_time,
+        "hours": hours
+    })
+    print("Attendance updated successfully!")
+
+
+def _read_punches(path):
+    """Yield (line number, punch dict) from a CSV or JSON Lines punch file"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if path.lower().endswith((".jsonl", ".json")):
+            for line_num, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
                 try:
-                    in_time = datetime.strptime(entry["sign_in"], DATETIME_FORMAT)
-                    out_time = datetime.strptime(entry["sign_out"], DATETIME_FORMAT)
-                    
-                    if out_time > in_time:
-                        hours = (out_time - in_time).total_seconds() / 3600
-                        entry["hours"] = round(hours, 2)
-                        print(f"Updated hours: {entry['hours']}")
-                    else:
-                        print("Warning: Out time must be after in time.")
-                except ValueError:
-                    print("Invalid time format!")
-            
-            save_data(ATTENDANCE_FILE, attendance)
-            print("Attendance updated successfully!")
-            return
+                    punch = json.loads(line)
+                except json.JSONDecodeError:
+                    punch = {}
+                # Valid JSON that is not an object is reported as an invalid punch too
+                yield line_num, punch if isinstance(punch, dict) else {}
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def _pair_punches(punches):
+    """
+    Pair the (epoch seconds, type) punches of one employee on one day into (sign_in, sign_out).
+    
+    A trailing in punch gives (sign_in, None), an out punch with no in punch
+    before it gives (None, sign_out); repeated in punches keep the first.
+    """
+    open_in = None
+    for punch_time, punch_type in sorted(punches):
+        if punch_type == "in":
+            if open_in is None:
+                open_in = punch_time
+        elif open_in is None:
+            yield None, punch_time
+        else:
+            yield open_in, punch_time
+            open_in = None
+    if open_in is not None:
+        yield open_in, None
+
+
+def ingest_punches(path):
+    """
+    Merge a time-clock punch file into attendance. Returns (records written, list of errors).
     
-    print("Entry not found.")
\ No newline at end of file
+    The file is CSV (columns emp_id, time, type) or JSON Lines with the same
+    keys; time is MM-DD-YYYY HH:MM:SS and type is "in" or "out". Punches are
+    paired per employee per day, hours are computed as in sign_out, and pairs
+    already in attendance are skipped. Everything is written in one batch.
+    """
+    start = time.perf_counter()
+    errors = []
+    seen = set()
+    days = {}
+    rows = duplicates = 0
+
+    for line_num, punch in _read_punches(path):
+        rows += 1
+        punch_type = str(punch.get("type", "")).strip().lower()
+        punch_time = str(punch.get("time", "")).strip()
+        try:
+            emp_id = int(punch.get("emp_id"))
+            parsed = datetime.strptime(punch_time, DATETIME_FORMAT)
+            punch_seconds = to_epoch(parsed)
+        except (TypeError, ValueError):
+            errors.append(f"Line {line_num}: invalid punch {punch}")
+            continue
+        if punch_type not in ("in", "out"):
+            errors.append(f"Line {line_num}: unknown punch type '{punch_type}'")
+            continue
+
+        # Badge readers resend punches; identical ones count once
+        key = (emp_id, punch_seconds, punch_type)
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        days.setdefault((emp_id, parsed.toordinal()), []).append((punch_seconds, punch_type))
+
+    attendance = get_repository().load_attendance({partition_for_day(day) for _, day in days})
+    recorded = {(r.emp_id, r.day, r.sign_in): r for r in attendance.records}
+    recorded_outs = {(r.emp_id, r.day, r.sign_out) for r in attendance.records if r.sign_out is not None}
+
+    events = []
+    closed = set()
+    skipped = 0
+    for (emp_id, day), punches in days.items():
+        for sign_in_time, sign_out_time in _pair_punches(punches):
+            if sign_in_time is None:
+                if (emp_id, day, sign_out_time) in recorded_outs:
+                    # A file ingested again, after the shift this out punch closed was recorded
+                    duplicates += 1
+                    continue
+                # Punched in on an earlier file, with only the out punch on this one
+                entry = attendance.find_open(emp_id, day)
+                if (entry is None or entry.sign_in is None or entry.sign_in >= sign_out_time
+                        or (emp_id, day, entry.sign_in) in closed):
+                    errors.append(f"Employee {emp_id}: out punch at {epoch_datetime(sign_out_time)} "
+                                  f"without an in punch")
+                    continue
+                sign_in_time = entry.sign_in
+
+            existing = recorded.get((emp_id, day, sign_in_time))
+            if existing is not None:
+                if (sign_out_time is not None and existing.sign_out is None
+                        and (emp_id, day, sign_in_time) not in closed):
+                    # Punched in on an earlier file, out on this one
+                    closed.add((emp_id, day, sign_in_time))
+                    events.append({"op": "sign_out", "emp_id": emp_id, "day": day,
+                                   "sign_out": sign_out_time,
+                                   "hours": _worked_hours(sign_in_time, sign_out_time)})
+                else:
+                    skipped += 1
+                continue
+
+            events.append({
+                "op": "add",
+                "emp_id": emp_id,
+                "day": day,
+                "sign_in": sign_in_time,
+                "sign_out": sign_out_time,
+                "hours": _worked_hours(sign_in_time, sign_out_time) if sign_out_time is not None else 0.0
+            })
+
+    attendance.record_many(events)
+
+    elapsed = time.perf_counter() - start
+    for error in errors:
+        print(error)
+    print(f"Read {rows} punches ({duplicates} duplicates), wrote {len(events)} attendance records, "
+          f"skipped {skipped} already recorded")
+    print(f"Ingested in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)")
+    return len(events), errors
+
+
+def import_punches():
+    """Import a time-clock punch file (HR only)"""
+    if not verify_hr_access():
+        return
+    print("\n--- Import Time-Clock Punches ---")
+    print("CSV (emp_id, time, type) or JSON Lines; time as MM-DD-YYYY HH:MM:SS, type in/out")
+    path = input("Punch file: ").strip()
+    try:
+        ingest_punches(path)
+    except OSError as e:
+        print(f"Cannot read {path}: {e.strerror}")
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""Single writer for kiosk punches, with group commit.
+
+Kiosk threads call AttendanceWriter.punch() (or submit() with a callback,
+as the punch service does). One writer thread applies every punch that
+arrives within GROUP_COMMIT_WINDOW_MS of the first, writes them as one batch
+(one journal append and one totals update per month, and one open-session
+table update), and only then answers each caller. Punches are checked
+against the open-session table, so no attendance history is loaded.
+"""
+import queue
+import threading
+import time
+from models import epoch_day, now_epoch
+from utils.storage import open_repository
+from services.attendance_service import punch_event
+from config import GROUP_COMMIT_WINDOW_MS, GROUP_COMMIT_MAX_BATCH
+
+
+class _Punch:
+    __slots__ = ("emp_id", "punch_type", "time", "accepted", "message", "on_done")
+
+    def __init__(self, emp_id, punch_type, time, on_done):
+        self.emp_id = emp_id
+        self.punch_type = punch_type
+        self.time = time
+        self.accepted = False
+        self.message = None
+        self.on_done = on_done
+
+
+class AttendanceWriter:
+    """Owns attendance writes for any number of kiosk threads"""
+
+    def __init__(self, window_ms=GROUP_COMMIT_WINDOW_MS, max_batch=GROUP_COMMIT_MAX_BATCH):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._repo = None
+
+        self._lock = threading.Lock()
+        # Who is signed in today: {emp_id: sign-in time}, kept up to date on every commit
+        self._on_site_day = None
+        self._on_site = {}
+        self._started = None
+        self._commits = 0
+        self._punches = 0
+        self._largest_batch = 0
+        self._commit_seconds = 0.0
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="attendance-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Commit whatever is queued, then stop the writer thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def submit(self, emp_id, punch_type, on_done):
+        """Queue an "in" or "out" punch; on_done(accepted, message) is called from the writer
+        thread once it is on disk"""
+        self._queue.put(_Punch(emp_id, punch_type, now_epoch(), on_done))
+
+    def punch(self, emp_id, punch_type):
+        """Submit an "in" or "out" punch and wait until it is on disk. Returns (accepted, message)."""
+        done = threading.Event()
+        result = []
+
+        def finished(accepted, message):
+            result.append((accepted, message))
+            done.set()
+
+        self.submit(emp_id, punch_type, finished)
+        done.wait()
+        return result[0]
+
+    def on_site(self):
+        """{emp_id: sign-in time} of everyone signed in today and not yet signed out"""
+        with self._lock:
+            if self._on_site_day != epoch_day(now_epoch()):
+                return {}
+            return dict(self._on_site)
+
+    def metrics(self):
+        """Commits, punches, commits and punches per second since start, batch sizes and commit time"""
+        with self._lock:
+            elapsed = time.perf_counter() - self._started if self._started else 0.0
+            commits = self._commits
+            return {
+                "commits": commits,
+                "punches": self._punches,
+                "commits_per_sec": commits / elapsed if elapsed else 0.0,
+                "punches_per_sec": self._punches / elapsed if elapsed else 0.0,
+                "mean_batch": self._punches / commits if commits else 0.0,
+                "max_batch": self._largest_batch,
+                "mean_commit_ms": self._commit_seconds * 1000 / commits if commits else 0.0,
+            }
+
+    def _run(self):
+        # A repository of its own: an SQLite connection belongs to the thread that opened it
+        self._repo = open_repository()
+        self._track_on_site(self._repo.open_sessions())
+        stopping = False
+        while not stopping:
+            request = self._queue.get()
+            if request is None:
+                break
+            batch = [request]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                try:
+                    request = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+            self._commit(batch)
+
+    def _track_on_site(self, sessions):
+        today = epoch_day(now_epoch())
+        on_site = sessions.on_site(today)
+        with self._lock:
+            self._on_site_day, self._on_site = today, on_site
+
+    def _commit(self, batch):
+        start = time.perf_counter()
+        try:
+            # Read fresh each batch and locked until committed: other processes punch through the same table
+            with self._repo.punch_sessions() as sessions:
+                for request in batch:
+                    event, request.message = punch_event(sessions, request.emp_id, request.punch_type,
+                                                         request.time)
+                    if event is not None:
+                        sessions.stage(event)
+                        request.accepted = True
+                sessions.commit()
+            self._track_on_site(sessions)
+        except Exception as e:
+            for request in batch:
+                if request.accepted or request.message is None:
+                    request.accepted, request.message = False, f"Punch not recorded: {e}"
+
+        with self._lock:
+            self._commits += 1
+            self._punches += len(batch)
+            self._largest_batch = max(self._largest_batch, len(batch))
+            self._commit_seconds += time.perf_counter() - start
+        for request in batch:
+            request.on_done(request.accepted, request.message)
\ No newline at end of file
@@ -1,13 +1,16 @@
+import csv
+import math
+import time
 from models import Employee
-from utils.data_handler import load_data, save_data, get_next_employee_id
+from utils.storage import get_repository
 from utils.select_handler import select_from_list
-from config import EMPLOYEE_FILE, DEPARTMENTS
+from config import DEPARTMENTS
 
 
 def register_employee():
     """Register a new employee using selection menus."""
-    employees = load_data(EMPLOYEE_FILE)
-    emp_id = get_next_employee_id(employees)
+    repo = get_repository()
+    emp_id = repo.next_employee_id()
 
     print("\n--- Register New Employee ---")
     name = input("Name: ")
@@ -32,15 +35,85 @@ def register_employee():
     contact = input("Contact: ")
 
     emp = Employee(emp_id, name, role, department, rate, contact)
-    employees.append(emp.to_dict())
-
-    save_data(EMPLOYEE_FILE, employees)
+    repo.add_employees([emp])
     print(f"Employee registered successfully! ID: {emp_id}")
 
 
+def _parse_import_row(row):
+    """Validate one CSV row; returns (name, role, department, rate, contact) or raises ValueError"""
+    name = (row.get("name") or "").strip()
+    department = (row.get("department") or "").strip()
+    role = (row.get("role") or "").strip()
+    contact = (row.get("contact") or "").strip()
+
+    if not name:
+        raise ValueError("missing name")
+    if department not in DEPARTMENTS:
+        raise ValueError(f"unknown department '{department}'")
+    if role not in DEPARTMENTS[department]:
+        raise ValueError(f"role '{role}' is not in {department}")
+    try:
+        rate = float(row.get("rate") or "")
+    except ValueError:
+        raise ValueError(f"invalid rate '{row.get('rate')}'")
+    if rate < 0 or not math.isfinite(rate):
+        raise ValueError(f"invalid rate '{row.get('rate')}'")
+
+    return name, role, department, rate, contact
+
+
+def import_employees_csv(path):
+    """
+    Bulk-register employees from a CSV with columns name, department, role,
+    rate, contact. Returns (number imported, list of row errors).
+    
+    Rows are validated as they are streamed; valid ones get consecutive IDs
+    and are saved in a single write. Invalid rows are reported and skipped.
+    """
+    repo = get_repository()
+    start = time.perf_counter()
+
+    next_id = repo.next_employee_id()
+    new_employees = []
+    errors = []
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            try:
+                name, role, department, rate, contact = _parse_import_row(row)
+            except ValueError as e:
+                errors.append(f"Row {reader.line_num}: {e}")
+                continue
+            new_employees.append(Employee(next_id, name, role, department, rate, contact))
+            next_id += 1
+
+    if new_employees:
+        repo.add_employees(new_employees)
+
+    elapsed = time.perf_counter() - start
+    for error in errors:
+        print(error)
+    rows = len(new_employees) + len(errors)
+    print(f"Imported {len(new_employees)} of {rows} rows in {elapsed:.2f}s "
+          f"({rows / elapsed if elapsed else 0:.0f} rows/s)")
+    return len(new_employees), errors
+
+
+def import_employees():
+    """Import employees from a CSV file"""
+    print("\n--- Import Employees from CSV ---")
+    print("Columns: name, department, role, rate, contact")
+    path = input("CSV file: ").strip()
+    try:
+        import_employees_csv(path)
+    except OSError as e:
+        print(f"Cannot read {path}: {e.strerror}")
+
+
 def edit_employee():
     """Edit an employee with preview, selection, and confirmation."""
-    employees = load_data(EMPLOYEE_FILE)
+    repo = get_repository()
 
     try:
         emp_id = int(input("Enter employee ID to edit: "))
@@ -48,65 +121,64 @@ def edit_employee():
         print("Invalid Employee ID!")
         return
 
-    for emp in employees:
-        if emp["emp_id"] == emp_id:
-
-            print("\n--- Current Employee Information ---")
-            print(f"Name       : {emp['name']}")
-            print(f"Role       : {emp['role']}")
-            print(f"Department : {emp['dept']}")
-            print(f"Rate       : {emp['rate']}")
-            print(f"Contact    : {emp['contact']}")
-            print("-" * 40)
-
-            new_name = edit_field("New Name", emp["name"])
-
-            # Select new department (or keep old)
-            print("\nPress Enter to keep the current department.")
-            dept_choice = input("Change department? (y/n): ").lower()
-
-            if dept_choice == 'y':
-                new_dept = select_from_list("Select Department", list(DEPARTMENTS.keys()))
-                if new_dept is None:
-                    return
-                new_role = select_from_list(f"Select Role for {new_dept}", DEPARTMENTS[new_dept])
-            else:
-                new_dept = emp["dept"]
-                new_role = emp["role"]
-
-            new_rate = edit_field("New Hourly Rate", emp["rate"], numeric=True)
-            new_contact = edit_field("New Contact", emp["contact"])
-
-            print("\n--- Confirm Changes ---")
-            print(f"Name       : {new_name}")
-            print(f"Department : {new_dept}")
-            print(f"Role       : {new_role}")
-            print(f"Rate       : {new_rate}")
-            print(f"Contact    : {new_contact}")
-            confirm = input("Save changes? (y/n): ")
-
-            if confirm.lower() != "y":
-                print("Changes canceled.")
-                return
-
-            # Save
-            emp["name"] = new_name
-            emp["dept"] = new_dept
-            emp["role"] = new_role
-            emp["rate"] = new_rate
-            emp["contact"] = new_contact
-
-            save_data(EMPLOYEE_FILE, employees)
-            print("Employee updated successfully!")
+    emp = repo.get_employee(emp_id)
+    if not emp:
+        print("Employee not found!")
+        return
+
+    print("\n--- Current Employee Information ---")
+    print(f"Name       : {emp.name}")
+    print(f"Role       : {emp.role}")
+    print(f"Department : {emp.dept}")
+    print(f"Rate       : {emp.rate}")
+    print(f"Contact    : {emp.contact}")
+    print("-" * 40)
+
+    new_name = edit_field("New Name", emp.name)
+
+    # Select new department (or keep old)
+    print("\nPress Enter to keep the current department.")
+    dept_choice = input("Change department? (y/n): ").lower()
+
+    if dept_choice == 'y':
+        new_dept = select_from_list("Select Department", list(DEPARTMENTS.keys()))
+        if new_dept is None:
             return
+        new_role = select_from_list(f"Select Role for {new_dept}", DEPARTMENTS[new_dept])
+    else:
+        new_dept = emp.dept
+        new_role = emp.role
+
+    new_rate = edit_field("New Hourly Rate", emp.rate, numeric=True)
+    new_contact = edit_field("New Contact", emp.contact)
+
+    print("\n--- Confirm Changes ---")
+    print(f"Name       : {new_name}")
+    print(f"Department : {new_dept}")
+    print(f"Role       : {new_role}")
+    print(f"Rate       : {new_rate}")
+    print(f"Contact    : {new_contact}")
+    confirm = input("Save changes? (y/n): ")
+
+    if confirm.lower() != "y":
+        print("Changes canceled.")
+        return
 
-    print("Employee not found!")
+    # Save
+    emp.name = new_name
+    emp.dept = new_dept
+    emp.role = new_role
+    emp.rate = new_rate
+    emp.contact = new_contact
+
+    repo.update_employee(emp)
+    print("Employee updated successfully!")
 
 
 
 def delete_employee():
     """Delete an employee from the system with confirmation"""
-    employees = load_data(EMPLOYEE_FILE)
+    repo = get_repository()
 
     try:
         emp_id = int(input("Enter employee ID to delete: "))
@@ -115,11 +187,7 @@ def delete_employee():
         return
 
     # Find the employee first
-    employee = None
-    for emp in employees:
-        if emp["emp_id"] == emp_id:
-            employee = emp
-            break
+    employee = repo.get_employee(emp_id)
 
     if not employee:
         print("Employee not found!")
@@ -127,10 +195,10 @@ def delete_employee():
 
     # Show employee details
     print("\nEmployee found:")
-    print(f"Name       : {employee['name']}")
-    print(f"Department : {employee['dept']}")
-    print(f"Role       : {employee['role']}")
-    print(f"Rate/hr    : ₱{employee['rate']:.2f}")
+    print(f"Name       : {employee.name}")
+    print(f"Department : {employee.dept}")
+    print(f"Role       : {employee.role}")
+    print(f"Rate/hr    : ₱{employee.rate:.2f}")
 
     # Confirm deletion
     confirm = input("\nAre you sure you want to DELETE this employee? (yes/no): ").strip().lower()
@@ -140,15 +208,14 @@ def delete_employee():
         return
 
     # Proceed with deletion
-    updated_employees = [emp for emp in employees if emp["emp_id"] != emp_id]
-    save_data(EMPLOYEE_FILE, updated_employees)
+    repo.delete_employee(emp_id)
 
     print("Employee successfully removed!")
 
     
 def list_employees():
     """Display all employees in a formatted table"""
-    employees = load_data(EMPLOYEE_FILE)
+    employees = get_repository().load_employees()
     
     if not employees:
         print("\nNo employees found in the system.")
@@ -161,8 +228,8 @@ def list_employees():
     print("-"*90)
     
     for emp in employees:
-        print(f"{emp['emp_id']:<5} {emp['name']:<20} {emp['role']:<15} "
-              f"{emp['dept']:<15} ₱{emp['rate']:<9.2f} {emp['contact']:<15}")
+        print(f"{emp.emp_id:<5} {emp.name:<20} {emp.role:<15} "
+              f"{emp.dept:<15} ₱{emp.rate:<9.2f} {emp.contact:<15}")
     
     print("="*90)
     print(f"Total Employees: {len(employees)}")
@@ -1,9 +1,12 @@
-import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from config import RED, GREEN, BOLD, RESET
-from utils.data_handler import load_data
+from utils.attendance_store import partition_days, partition_for_month, summarize_hours
+from utils.storage import get_repository
+from utils.payroll_cache import cache_key, get_cached, store_cached
 from utils.security import verify_hr_access
-from config import (EMPLOYEE_FILE, ATTENDANCE_FILE, HR_PASSWORD, 
-                   REGULAR_HOURS_PER_DAY, OVERTIME_MULTIPLIER)
+from utils.profiling import stage
+from config import HR_PASSWORD, OVERTIME_MULTIPLIER, PAYROLL_WORKERS
 
 
 def prepare_payroll_inputs():
@@ -11,12 +14,13 @@ def prepare_payroll_inputs():
     if not verify_hr_access():
         return
     """Assign allowances and deductions to each employee for a specific month"""
-    employees = load_data(EMPLOYEE_FILE)
+    repo = get_repository()
+    employees = repo.load_employees()
     month = input("Enter Month-Year (MM-YYYY): ")
 
     payroll_inputs = []
     for emp in employees:
-        print(f"\nEmployee: {emp['name']} (ID: {emp['emp_id']})")
+        print(f"\nEmployee: {emp.name} (ID: {emp.emp_id})")
         try:
             allowance = float(input("Enter Allowances: ") or 0)
             deduction = float(input("Enter Deductions: ") or 0)
@@ -26,15 +30,14 @@ def prepare_payroll_inputs():
             deduction = 0
         
         payroll_inputs.append({
-            "emp_id": emp["emp_id"],
+            "emp_id": emp.emp_id,
             "month": month,
             "allowance": allowance,
             "deduction": deduction
         })
 
-    # Save to JSON for later use in payroll generation
-    with open("payroll_inputs.json", "w") as f:
-        json.dump(payroll_inputs, f, indent=4)
+    # Save for later use in payroll generation
+    repo.save_payroll_inputs(payroll_inputs)
     
     print("\nPayroll inputs saved!")
     
@@ -58,31 +61,28 @@ def generate_individual_payslip():
         print("Invalid format! Use MM-YYYY")
         return
     
-    employees = load_data(EMPLOYEE_FILE)
-    attendance = load_data(ATTENDANCE_FILE)
+    repo = get_repository()
     
     # Find the employee
-    employee = next((e for e in employees if e["emp_id"] == emp_id), None)
+    employee = repo.get_employee(emp_id)
     if not employee:
         print("Employee not found!")
         return
 
-    # Load allowances/deductions from prepared inputs
-    try:
-        with open("payroll_inputs.json", "r") as f:
-            payroll_inputs = json.load(f)
-    except FileNotFoundError:
+    # Pay data from prepared allowances/deductions
+    payroll = month_payroll(month)
+    if payroll is None:
         print("Payroll inputs not found! Please prepare payroll first.")
         return
     
-    payroll_input = next((x for x in payroll_inputs if x["emp_id"] == emp_id and x["month"] == month), {})
-    pay_data = calculate_pay(employee, attendance, payroll_input, month)
+    pay_data = payroll.get(emp_id)
     if not pay_data:
-        print(f"No attendance records found for {employee['name']} in {month}")
+        print(f"No attendance records found for {employee.name} in {month}")
         return
 
-    _print_payslip(employee, month, pay_data["reg_hours"], pay_data["ot_hours"], pay_data["rate"],
-                   pay_data["gross"], pay_data["allowance"], pay_data["deduction"], pay_data["net"])
+    with stage("report.print"):
+        _print_payslip(employee, month, pay_data["reg_hours"], pay_data["ot_hours"], pay_data["rate"],
+                       pay_data["gross"], pay_data["allowance"], pay_data["deduction"], pay_data["net"])
 
     
 def generate_payroll():
@@ -92,28 +92,23 @@ def generate_payroll():
     """Generate payroll automatically using prepared inputs"""
     month = input("Enter Month-Year (MM-YYYY): ")
     
-    employees = load_data(EMPLOYEE_FILE)
-    attendance = load_data(ATTENDANCE_FILE)
-    
-    # Load previously prepared allowances/deductions
-    try:
-        with open("payroll_inputs.json", "r") as f:
-            payroll_inputs = json.load(f)
-    except FileNotFoundError:
+    # Uses previously prepared allowances/deductions
+    payroll = month_payroll(month)
+    if payroll is None:
         print("Payroll inputs not found! Please prepare payroll first.")
         return
     
+    employees = get_repository().load_employees()
     payroll_summary = []
     
     for emp in employees:
-        payroll_input = next((x for x in payroll_inputs if x["emp_id"] == emp["emp_id"] and x["month"] == month), {})
-        pay_data = calculate_pay(emp, attendance, payroll_input, month)
+        pay_data = payroll.get(emp.emp_id)
         if not pay_data:
             continue  # skip employees with no attendance
 
         payroll_summary.append({
-            "id": emp["emp_id"],
-            "name": emp["name"],
+            "id": emp.emp_id,
+            "name": emp.name,
             "rate": pay_data["rate"],
             "reg_hrs": pay_data["reg_hours"],
             "ot_hrs": pay_data["ot_hours"],
@@ -123,7 +118,8 @@ def generate_payroll():
             "net": pay_data["net"]
         })
 
-    _print_payroll_summary(month, payroll_summary)
+    with stage("report.print"):
+        _print_payroll_summary(month, payroll_summary)
     
 
 def _print_payslip(emp, month, regular_hours, overtime_hours, rate, 
@@ -133,11 +129,11 @@ def _print_payslip(emp, month, regular_hours, overtime_hours, rate,
     overtime_pay = overtime_hours * rate * OVERTIME_MULTIPLIER
     
     print("\n" + "="*50)
-    print(f"         {BOLD}PAYSLIP FOR {emp['name'].upper()}{RESET}")
+    print(f"         {BOLD}PAYSLIP FOR {emp.name.upper()}{RESET}")
     print("="*50)
-    print(f"Employee ID    : {emp['emp_id']}")
-    print(f"Department     : {emp['dept']}")
-    print(f"Role           : {emp['role']}")
+    print(f"Employee ID    : {emp.emp_id}")
+    print(f"Department     : {emp.dept}")
+    print(f"Role           : {emp.role}")
     print(f"Period         : {month}")
     print("-"*50)
     print(f"{BOLD}HOURS WORKED{RESET}")
@@ -213,38 +209,182 @@ def _print_payroll_summary(month, payroll_summary):
     print("="*120)
     print()
 
-def calculate_pay(emp, attendance, payroll_input, month):
+def run_payroll_batch(months, departments=None, workers=None):
+    """
+    Payroll for several months, split by department, across worker processes.
+    
+    Returns [(month, department, rows)] in month then department order,
+    department None meaning all departments; rows is None when payroll
+    inputs were never prepared. workers defaults to config.PAYROLL_WORKERS,
+    or the CPU count.
+    """
+    departments = departments or [None]
+    workers = min(workers or PAYROLL_WORKERS or os.cpu_count() or 1, len(months))
+
+    # One task per month: its departments share the month's totals and inputs
+    with stage("payroll.batch"):
+        if workers <= 1:
+            results = [_payroll_task(month, departments) for month in months]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_payroll_task, months, [departments] * len(months)))
+    return [result for month_results in results for result in month_results]
+
+
+def _payroll_task(month, departments):
+    """Worker: summary rows of one month for each department (None for all)"""
+    payroll = month_payroll(month)
+    if payroll is None:
+        return [(month, department, None) for department in departments]
+
+    employees = get_repository().load_employees()
+    results = []
+    for department in departments:
+        rows = []
+        for emp in employees:
+            if department is not None and emp.dept != department:
+                continue
+            pay_data = payroll.get(emp.emp_id)
+            if not pay_data:
+                continue
+            rows.append({
+                "month": month,
+                "dept": emp.dept,
+                "id": emp.emp_id,
+                "name": emp.name,
+                "rate": pay_data["rate"],
+                "reg_hrs": pay_data["reg_hours"],
+                "ot_hrs": pay_data["ot_hours"],
+                "allowance": pay_data["allowance"],
+                "deduction": pay_data["deduction"],
+                "gross": pay_data["gross"],
+                "net": pay_data["net"]
+            })
+        results.append((month, department, rows))
+    return results
+
+
+def print_batch_summary(results):
+    """Print one consolidated line per month/department from run_payroll_batch, with grand totals"""
+    print("\n" + "="*120)
+    print(f"{'CONSOLIDATED PAYROLL SUMMARY':^120}")
+    print("="*120)
+    print(
+        f"{'Month':<9} {'Department':<16} {'Staff':<7} {'Reg Hrs':<11} {'OT Hrs':<10} "
+        f"{'Allowance':<13} {'Gross':<14} {'Deduction':<13} {'Net Pay':<14}"
+    )
+    print("-"*120)
+
+    grand = [0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+    for month, department, rows in results:
+        totals = [len(rows), sum(p["reg_hrs"] for p in rows), sum(p["ot_hrs"] for p in rows),
+                  sum(p["allowance"] for p in rows), sum(p["gross"] for p in rows),
+                  sum(p["deduction"] for p in rows), sum(p["net"] for p in rows)]
+        grand = [a + b for a, b in zip(grand, totals)]
+        print(f"{month:<9} {department or 'All':<16} {_batch_line(totals)}")
+
+    print("="*120)
+    print(f"{'TOTAL':<26} {_batch_line(grand)}")
+    print("="*120)
+    print()
 
-    emp_id = emp["emp_id"]
-    
-    regular_hours = 0
-    overtime_hours = 0
-    has_attendance = False
-
-    for entry in attendance:
-        if entry["emp_id"] == emp_id:
-            entry_date = entry["date"]
-            if entry_date[:2] == month[:2] and entry_date[6:] == month[3:]:
-                has_attendance = True
-                hours = entry["hours"]
-                if hours > REGULAR_HOURS_PER_DAY:
-                    regular_hours += REGULAR_HOURS_PER_DAY
-                    overtime_hours += hours - REGULAR_HOURS_PER_DAY
-                else:
-                    regular_hours += hours
-
-    if not has_attendance:
+
+def _batch_line(totals):
+    staff, reg, ot, allowance, gross, deduction, net = totals
+    return (f"{staff:<7} {reg:<11.2f} {ot:<10.2f} ₱{allowance:<12.2f} "
+            f"₱{gross:<13.2f} ₱{deduction:<12.2f} ₱{net:<13.2f}")
+
+
+def month_payroll(month, include_absent=False):
+    """compute_payroll for every employee in a month, or None if payroll inputs were never prepared.
+
+    Results are cached on disk under a hash of the month and the storage
+    fingerprint, so a repeat view of an unchanged month is not recomputed
+    and any change to employees, attendance, its monthly totals or inputs
+    misses the cache.
+    """
+    repo = get_repository()
+    key = cache_key(month, include_absent, repo.fingerprint(month))
+    payroll = get_cached(key)
+    if payroll is not None:
+        return payroll
+
+    payroll_inputs = repo.load_payroll_inputs()
+    if payroll_inputs is None:
+        return None
+    payroll = compute_payroll(repo.load_employees(), repo.month_hours(month), payroll_inputs, month, include_absent)
+    store_cached(key, payroll)
+    return payroll
+
+
+def compute_payroll(employees, hours, payroll_inputs, month, include_absent=False):
+    """Pay data for every employee in a month, keyed by emp_id, in O(E).
+
+    hours is the storage backend's materialized per-employee totals for the
+    month, {emp_id: [regular, overtime, days]} (see month_hours), so nothing
+    is recomputed from raw attendance. Employees without attendance
+    are skipped unless include_absent is set, in which case they are paid
+    allowances only.
+    """
+    with stage("payroll.compute"):
+        inputs = {x["emp_id"]: x for x in payroll_inputs if x.get("month") == month}
+
+        payroll = {}
+        for emp in employees:
+            emp_hours = hours.get(emp.emp_id)
+            if emp_hours is None:
+                if not include_absent:
+                    continue
+                emp_hours = (0.0, 0.0)
+            payroll[emp.emp_id] = _pay_data(emp, emp_hours[0], emp_hours[1], inputs.get(emp.emp_id, {}))
+
+    return payroll
+
+
+def rebuild_payroll_totals(months=None):
+    """Regenerate the monthly totals from raw attendance (all months when None) and report any drift.
+
+    Returns the number of employee-months whose stored totals were wrong.
+    """
+    mismatches = get_repository().rebuild_totals(months)
+    for partition, emp_id, stored, actual in mismatches:
+        print(f"{partition} employee {emp_id}: stored {_format_totals(stored)}, actual {_format_totals(actual)}")
+    print(f"Monthly totals rebuilt, {len(mismatches)} mismatches found")
+    return len(mismatches)
+
+
+def _format_totals(totals):
+    if totals is None:
+        return "none"
+    return f"{totals[0]:.2f} reg / {totals[1]:.2f} OT hrs, {totals[2]} days"
+
+
+def calculate_pay(emp, attendance, payroll_input, month):
+    """Pay data for a single employee from raw attendance, or None without attendance that month"""
+    partition = partition_for_month(month)
+    if partition is None:
+        return None
+    first_day, end_day = partition_days(partition)
+    with stage("payroll.compute"):
+        month_records = (e for e in attendance
+                         if e.emp_id == emp.emp_id and first_day <= e.day < end_day)
+        emp_hours = summarize_hours(month_records).get(emp.emp_id)
+    if emp_hours is None:
         return None  # no attendance for this month
 
-    rate = emp["rate"]
-    allowance = payroll_input.get("allowance", 0)
-    deduction = payroll_input.get("deduction", 0)
+    return _pay_data(emp, emp_hours[0], emp_hours[1], payroll_input)
+
+
+def _pay_data(emp, regular_hours, overtime_hours, payroll_input):
+    rate = float(emp.rate or 0)
+    allowance = float(payroll_input.get("allowance", 0))
+    deduction = float(payroll_input.get("deduction", 0))
     
     gross_pay = (regular_hours * rate) + (overtime_hours * rate * OVERTIME_MULTIPLIER) + allowance
     net_pay = gross_pay - deduction
 
     return {
-        "emp": emp,
+        "emp": emp.to_dict(),
         "reg_hours": regular_hours,
         "ot_hours": overtime_hours,
         "rate": rate,
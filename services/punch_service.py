@@ -0,0 +1,132 @@
+"""Local HTTP punch service for sign-in kiosks (asyncio, stdlib only).
+
+    python main.py serve --port 8750
+
+    POST /sign-in    {"emp_id": 12}   -> 200 {"ok": true, "message": "Signed in successfully!"}
+    POST /sign-out   {"emp_id": 12}   -> 200, or 409 with "ok": false when refused
+    GET  /on-site                     -> everyone signed in today and not signed out
+    GET  /metrics                     -> writer commits, batch sizes and punch counts
+
+Punches go through one AttendanceWriter, so everything arriving together is
+committed in one write; each reply is sent once its punch is on disk.
+Connections are kept alive between requests.
+"""
+import asyncio
+import json
+from models import epoch_datetime, epoch_day, now_epoch, ordinal_date
+from services.attendance_writer import AttendanceWriter
+from config import PUNCH_SERVICE_HOST, PUNCH_SERVICE_PORT
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 409: "Conflict",
+           413: "Content Too Large"}
+
+# A punch body is {"emp_id": ...}; anything much larger is refused unread
+MAX_BODY_BYTES = 4096
+
+PUNCH_PATHS = {"/sign-in": "in", "/sign-out": "out"}
+
+
+class PunchService:
+    def __init__(self, writer):
+        self.writer = writer
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until the client closes it"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, path, _ = lines[0].split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    status, payload = 400, {"ok": False, "message": "Invalid Content-Length"}
+                elif length > MAX_BODY_BYTES:
+                    status, payload = 413, {"ok": False, "message": "Request body too large"}
+                else:
+                    body = await reader.readexactly(length)
+                    status, payload = await self.respond(method, path.split("?", 1)[0], body)
+
+                data = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+                await writer.drain()
+                # The body of a refused request was not read, so the connection cannot be reused
+                if not 0 <= length <= MAX_BODY_BYTES:
+                    break
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, method, path, body):
+        """(status, JSON payload) for one request"""
+        if path in PUNCH_PATHS:
+            if method != "POST":
+                return 405, {"ok": False, "message": "Use POST"}
+            try:
+                emp_id = int(json.loads(body or b"{}")["emp_id"])
+            except (ValueError, KeyError, TypeError):
+                return 400, {"ok": False, "message": "Invalid Employee ID!"}
+            accepted, message = await self.punch(emp_id, PUNCH_PATHS[path])
+            return (200 if accepted else 409), {"ok": accepted, "message": message}
+
+        if path == "/on-site" and method == "GET":
+            on_site = self.writer.on_site()
+            return 200, {"date": ordinal_date(epoch_day(now_epoch())), "count": len(on_site),
+                         "employees": [{"emp_id": emp_id, "sign_in": epoch_datetime(sign_in)}
+                                       for emp_id, sign_in in sorted(on_site.items())]}
+
+        if path == "/metrics" and method == "GET":
+            return 200, self.writer.metrics()
+
+        return 404, {"ok": False, "message": "Not found"}
+
+    def punch(self, emp_id, punch_type):
+        """Future of (accepted, message), resolved on the event loop once the punch is committed"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.writer.submit(emp_id, punch_type,
+                           lambda accepted, message: loop.call_soon_threadsafe(_resolve, future,
+                                                                               (accepted, message)))
+        return future
+
+
+def _resolve(future, result):
+    # The client may have gone away while the punch was being committed
+    if not future.done():
+        future.set_result(result)
+
+
+async def _serve(host, port):
+    writer = AttendanceWriter().start()
+    service = PunchService(writer)
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Punch service on http://{host}:{port} (Ctrl+C to stop)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        writer.stop()
+
+
+def serve(host=PUNCH_SERVICE_HOST, port=PUNCH_SERVICE_PORT):
+    """Run the punch service until interrupted"""
+    try:
+        asyncio.run(_serve(host, port))
+    except KeyboardInterrupt:
+        print("\nPunch service stopped.")
\ No newline at end of file
@@ -1,238 +1,206 @@
-import json
+import os
+from collections import namedtuple
 from datetime import datetime
-from utils.data_handler import load_data
-from utils.export_helpers import save_csv, save_pdf, save_text
+from functools import partial
+from models import date_ordinal, ordinal_date, epoch_datetime
+from utils.attendance_store import partition_for_date, partition_for_month
+from utils.storage import get_repository
+from services.payroll_service import compute_payroll, month_payroll
+from utils.export_helpers import save_csv, save_pdf
 from utils.security import verify_hr_access
-from config import (EMPLOYEE_FILE, ATTENDANCE_FILE, RED, GREEN, BOLD, RESET,
-                    DATE_FORMAT, DATETIME_FORMAT,
-                    REGULAR_HOURS_PER_DAY, OVERTIME_MULTIPLIER)
+from utils.profiling import stage, timed_iter
+from config import GREEN, BOLD, RESET, REGULAR_HOURS_PER_DAY
 
 REPORT_DIR = "reports/"
 
+# Rows printed in on-screen previews; totals still cover every row
+PREVIEW_ROWS = 25
 
-def _parse_date(date_str):
+# A built report. rows and lines are callables returning fresh generators,
+# preview prints the on-screen summary from an iterable of rows.
+Report = namedtuple("Report", ["name", "title", "fieldnames", "rows", "lines", "preview"])
+
+
+def _parse_day(date_str):
     try:
-        return datetime.strptime(date_str, DATE_FORMAT)
-    except Exception:
+        return date_ordinal(date_str)
+    except ValueError:
         return None
 
 
-def _load_payroll_inputs():
-    try:
-        with open("payroll_inputs.json", "r") as f:
-            return json.load(f)
-    except Exception:
-        return []
+def _valid_month(month):
+    return len(month) == 7 and month[2] == '-'
 
 
-def export_monthly_payroll():
-    """HR-only: export a payroll CSV for a given month (MM-YYYY)."""
-    if not verify_hr_access():
-        return
-    month = input("Enter Month-Year (MM-YYYY): ").strip()
-    if len(month) != 7 or month[2] != '-':
-        print("Invalid format. Use MM-YYYY.")
-        return
+def _valid_date(date_str):
+    return len(date_str) == 10 and date_str[2] == '-' and date_str[5] == '-'
 
-    employees = load_data(EMPLOYEE_FILE)
-    attendance = load_data(ATTENDANCE_FILE)
-    payroll_inputs = _load_payroll_inputs()
 
-    rows = []
-    fieldnames = ["id", "name", "department", "role", "rate", "regular_hours", "overtime_hours", "allowance", "deduction", "gross", "net"]
+# ========== REPORT BUILDERS ==========
 
-    for emp in employees:
-        emp_id = emp["emp_id"]
-        rate = float(emp.get("rate", 0))
-        reg_hours = 0.0
-        ot_hours = 0.0
-        has_att = False
-
-        for entry in attendance:
-            if entry.get("emp_id") != emp_id:
-                continue
-            entry_date = entry.get("date", "")
-            if len(entry_date) == 10 and entry_date[:2] == month[:2] and entry_date[6:] == month[3:]:
-                has_att = True
-                hours = float(entry.get("hours", 0) or 0)
-                if hours > REGULAR_HOURS_PER_DAY:
-                    reg_hours += REGULAR_HOURS_PER_DAY
-                    ot_hours += (hours - REGULAR_HOURS_PER_DAY)
-                else:
-                    reg_hours += hours
-
-        # find prepared inputs for this emp/month
-        p_input = next((p for p in payroll_inputs if p.get("emp_id") == emp_id and p.get("month") == month), {})
-        allowance = float(p_input.get("allowance", 0))
-        deduction = float(p_input.get("deduction", 0))
-
-        gross = (reg_hours * rate) + (ot_hours * rate * OVERTIME_MULTIPLIER) + allowance
-        net = gross - deduction
-
-        rows.append({
-            "id": emp_id,
-            "name": emp.get("name"),
-            "department": emp.get("dept"),
-            "role": emp.get("role"),
-            "rate": f"{rate:.2f}",
-            "regular_hours": f"{reg_hours:.2f}",
-            "overtime_hours": f"{ot_hours:.2f}",
-            "allowance": f"{allowance:.2f}",
-            "deduction": f"{deduction:.2f}",
-            "gross": f"{gross:.2f}",
-            "net": f"{net:.2f}"
-        })
+def build_monthly_payroll_report(month):
+    """Build the monthly payroll report for a month (MM-YYYY)."""
+    repo = get_repository()
+    employees = repo.load_employees()
 
-    # Display preview
-    _print_monthly_payroll_preview(month, rows)
-    
-    # Ask for export format
-    export_choice = input("\nExport as (1) CSV, (2) PDF, or (3) Skip: ").strip()
-    
-    if export_choice == "1":
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_filename = f"monthly_payroll_{month.replace('-', '')}_{timestamp}.csv"
-        path = save_csv(default_filename, fieldnames, rows, use_dialog=True)
-        
-        if path:
-            print(f"{GREEN}✓ Monthly payroll CSV exported: {path}{RESET}")
-        return path
+    fieldnames = ["id", "name", "department", "role", "rate", "regular_hours", "overtime_hours", "allowance", "deduction", "gross", "net"]
 
-    elif export_choice == "2":
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_filename = f"monthly_payroll_{month.replace('-', '')}_{timestamp}.pdf"
-        lines = _build_monthly_payroll_lines(month, rows)
-        path = save_pdf(default_filename, f"Monthly Payroll Report - {month}", lines, use_dialog=True)
-        
-        if path:
-            print(f"{GREEN}✓ Monthly payroll PDF exported: {path}{RESET}")
-        return path
-    else:
-        print("Report generation complete (not exported)")
+    payroll = month_payroll(month, include_absent=True)
+    if payroll is None:
+        # No payroll inputs prepared yet: hours only
+        payroll = compute_payroll(employees, repo.month_hours(month), [], month, include_absent=True)
+    rows = partial(_iter_monthly_payroll_rows, employees, payroll)
 
+    return Report(f"monthly_payroll_{month.replace('-', '')}", f"Monthly Payroll Report - {month}", fieldnames,
+                  rows, lambda: _build_monthly_payroll_lines(month, timed_iter("report.rows", rows())),
+                  partial(_print_monthly_payroll_preview, month))
 
-def export_individual_attendance():
-    """Export a single employee's attendance history to CSV or PDF."""
-    if not verify_hr_access():
-        return
-    try:
-        emp_id = int(input("Enter Employee ID: "))
-    except ValueError:
-        print("Invalid Employee ID.")
-        return
 
-    employees = load_data(EMPLOYEE_FILE)
-    attendance = load_data(ATTENDANCE_FILE)
+def build_attendance_history_report(emp_id):
+    """Build one employee's attendance history report, or None (with a message) if there is nothing to report."""
+    repo = get_repository()
     
     # Find employee
-    employee = next((e for e in employees if e["emp_id"] == emp_id), None)
+    employee = repo.get_employee(emp_id)
     if not employee:
         print("Employee not found!")
-        return
+        return None
     
-    rows = []
     fieldnames = ["emp_id", "emp_name", "date", "sign_in", "sign_out", "hours"]
 
-    filtered = [a for a in attendance if a.get("emp_id") == emp_id]
     # sort by date
-    filtered.sort(key=lambda x: _parse_date(x.get("date", "")) or datetime.min)
+    filtered = sorted(repo.load_employee_attendance(emp_id), key=lambda x: x.day)
 
-    for e in filtered:
-        rows.append({
-            "emp_id": emp_id,
-            "emp_name": employee["name"],
-            "date": e.get("date", ""),
-            "sign_in": e.get("sign_in") or "N/A",
-            "sign_out": e.get("sign_out") or "N/A",
-            "hours": f"{float(e.get('hours', 0)):.2f}"
-        })
-
-    if not rows:
-        print(f"No attendance records found for {employee['name']}")
-        return
+    if not filtered:
+        print(f"No attendance records found for {employee.name}")
+        return None
+
+    rows = partial(_iter_attendance_history_rows, employee, filtered)
+
+    return Report(f"attendance_history_emp_{emp_id}", f"Attendance History - {employee.name}", fieldnames,
+                  rows, lambda: _build_attendance_history_lines(employee, timed_iter("report.rows", rows())),
+                  partial(_print_attendance_history_preview, employee))
+
+
+def build_overtime_report(month):
+    """Build the overtime report for a month (MM-YYYY), or None (with a message) if nobody worked overtime."""
+    repo = get_repository()
+    employees = repo.load_employees()
+    attendance = repo.load_attendance_columns([partition_for_month(month)])
+    names = {e.emp_id: e.name for e in employees}
+    fieldnames = ["emp_id", "name", "date", "hours", "overtime_hours"]
+
+    rows = partial(_iter_overtime_rows, month, attendance, names)
+
+    if next(rows(), None) is None:
+        print(f"No overtime records found for {month}")
+        return None
+
+    return Report(f"overtime_report_{month.replace('-', '')}", f"Overtime Report - {month}", fieldnames,
+                  rows, lambda: _build_overtime_report_lines(month, timed_iter("report.rows", rows())),
+                  partial(_print_overtime_report_preview, month))
+
+
+def build_daily_attendance_report(date_str):
+    """Build the daily attendance summary for a date (MM-DD-YYYY) - includes all employees."""
+    repo = get_repository()
+    attendance = repo.load_attendance([partition_for_date(date_str)])
+    employees = repo.load_employees()
+
+    fieldnames = ["emp_id", "name", "sign_in", "sign_out", "hours"]
+
+    rows = partial(_iter_daily_attendance_rows, _parse_day(date_str), employees, attendance)
+
+    return Report(f"daily_summary_{date_str.replace('-', '')}", f"Daily Attendance Summary - {date_str}", fieldnames,
+                  rows, lambda: _build_daily_attendance_lines(date_str, timed_iter("report.rows", rows())),
+                  partial(_print_daily_attendance_preview, date_str))
+
+
+def write_report(report, file_format, out_dir=None, use_dialog=False):
+    """
+    Write a report as "csv" or "pdf". Returns the path, or None if cancelled.
+    
+    With use_dialog the user picks the location (file name is timestamped);
+    otherwise it is written to out_dir as <report name>.<format>.
+    """
+    if use_dialog:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = f"{report.name}_{timestamp}.{file_format}"
+    else:
+        path = os.path.join(out_dir or REPORT_DIR, f"{report.name}.{file_format}")
+
+    if file_format == "csv":
+        return save_csv(path, report.fieldnames, timed_iter("report.rows", report.rows()), use_dialog=use_dialog)
+    if file_format == "pdf":
+        return save_pdf(path, report.title, timed_iter("report.lines", report.lines()), use_dialog=use_dialog)
+    raise ValueError(f"Unknown report format: {file_format}")
 
+
+def _preview_and_export(report, csv_message, pdf_message):
+    """Show a report preview, then ask whether to export it and where"""
     # Display preview
-    _print_attendance_history_preview(employee, rows)
+    with stage("report.print"):
+        report.preview(timed_iter("report.rows", report.rows()))
     
     # Ask for export format
     export_choice = input("\nExport as (1) CSV, (2) PDF, or (3) Skip: ").strip()
     
     if export_choice == "1":
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_filename = f"attendance_history_emp_{emp_id}_{timestamp}.csv"
-        path = save_csv(default_filename, fieldnames, rows, use_dialog=True)
+        path = write_report(report, "csv", use_dialog=True)
         if path:
-            print(f"{GREEN}✓ Attendance history exported: {path}{RESET}")
+            print(f"{GREEN}✓ {csv_message}: {path}{RESET}")
         return path
     elif export_choice == "2":
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_filename = f"attendance_history_emp_{emp_id}_{timestamp}.pdf"
-        lines = _build_attendance_history_lines(employee, rows)
-        path = save_pdf(default_filename, f"Attendance History - {employee['name']}", lines, use_dialog=True)
+        path = write_report(report, "pdf", use_dialog=True)
         if path:
-            print(f"{GREEN}✓ Attendance history exported: {path}{RESET}")
+            print(f"{GREEN}✓ {pdf_message}: {path}{RESET}")
         return path
     else:
         print("Report generation complete (not exported)")
 
 
-def export_overtime_report():
-    """Export overtime occurrences for a specified month (MM-YYYY)."""
+# ========== INTERACTIVE EXPORTS ==========
+
+def export_monthly_payroll():
+    """HR-only: export a payroll CSV for a given month (MM-YYYY)."""
     if not verify_hr_access():
         return
     month = input("Enter Month-Year (MM-YYYY): ").strip()
-    if len(month) != 7 or month[2] != '-':
+    if not _valid_month(month):
         print("Invalid format. Use MM-YYYY.")
         return
 
-    employees = load_data(EMPLOYEE_FILE)
-    attendance = load_data(ATTENDANCE_FILE)
-    rows = []
-    fieldnames = ["emp_id", "name", "date", "hours", "overtime_hours"]
+    report = build_monthly_payroll_report(month)
+    return _preview_and_export(report, "Monthly payroll CSV exported", "Monthly payroll PDF exported")
 
-    for entry in attendance:
-        d = entry.get("date", "")
-        if len(d) == 10 and d[:2] == month[:2] and d[6:] == month[3:]:
-            hours = float(entry.get("hours", 0) or 0)
-            if hours > REGULAR_HOURS_PER_DAY:
-                ot = round(hours - REGULAR_HOURS_PER_DAY, 2)
-                emp = next((e for e in employees if e["emp_id"] == entry["emp_id"]), None)
-                name = emp["name"] if emp else f"Employee {entry['emp_id']}"
-                rows.append({
-                    "emp_id": entry["emp_id"],
-                    "name": name,
-                    "date": d,
-                    "hours": f"{hours:.2f}",
-                    "overtime_hours": f"{ot:.2f}"
-                })
-
-    if not rows:
-        print(f"No overtime records found for {month}")
+
+def export_individual_attendance():
+    """Export a single employee's attendance history to CSV or PDF."""
+    if not verify_hr_access():
+        return
+    try:
+        emp_id = int(input("Enter Employee ID: "))
+    except ValueError:
+        print("Invalid Employee ID.")
         return
 
-    # Display preview
-    _print_overtime_report_preview(month, rows)
-    
-    # Ask for export format
-    export_choice = input("\nExport as (1) CSV, (2) PDF, or (3) Skip: ").strip()
-    
-    if export_choice == "1":
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_filename = f"overtime_report_{month.replace('-', '')}_{timestamp}.csv"
-        path = save_csv(default_filename, fieldnames, rows, use_dialog=True)
-        if path:    
-            print(f"{GREEN}✓ Overtime report exported: {path}{RESET}")
-        return path
-    elif export_choice == "2":
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_filename = f"overtime_report_{month.replace('-', '')}_{timestamp}.pdf"
-        lines = _build_overtime_report_lines(month, rows)
-        path = save_pdf(default_filename,  f"Overtime Report - {month}", lines, use_dialog=True)
-        if path:
-            print(f"{GREEN}✓ Overtime report exported: {path}{RESET}")
-        return path
-    else:
-        print("Report generation complete (not exported)")
+    report = build_attendance_history_report(emp_id)
+    if report:
+        return _preview_and_export(report, "Attendance history exported", "Attendance history exported")
+
+
+def export_overtime_report():
+    """Export overtime occurrences for a specified month (MM-YYYY)."""
+    if not verify_hr_access():
+        return
+    month = input("Enter Month-Year (MM-YYYY): ").strip()
+    if not _valid_month(month):
+        print("Invalid format. Use MM-YYYY.")
+        return
+
+    report = build_overtime_report(month)
+    if report:
+        return _preview_and_export(report, "Overtime report exported", "Overtime report exported")
 
 
 def export_daily_attendance_summary():
@@ -240,64 +208,100 @@ def export_daily_attendance_summary():
     if not verify_hr_access():
         return
     date_str = input("Enter Date (MM-DD-YYYY): ").strip()
-    if len(date_str) != 10 or date_str[2] != '-' or date_str[5] != '-':
+    if not _valid_date(date_str):
         print("Invalid date format. Use (MM-DD-YYYY).")
         return
 
-    attendance = load_data(ATTENDANCE_FILE)
-    employees = load_data(EMPLOYEE_FILE)
+    report = build_daily_attendance_report(date_str)
+    return _preview_and_export(report, "Daily attendance summary exported", "Daily attendance summary exported")
 
-    rows = []
-    fieldnames = ["emp_id", "name", "sign_in", "sign_out", "hours"]
+# ========== ROW PRODUCERS ==========
+
+def _iter_monthly_payroll_rows(employees, payroll):
+    """Yield monthly payroll rows one employee at a time"""
+    for emp in employees:
+        emp_id = emp.emp_id
+        pay_data = payroll[emp_id]
 
+        yield {
+            "id": emp_id,
+            "name": emp.name,
+            "department": emp.dept,
+            "role": emp.role,
+            "rate": f"{pay_data['rate']:.2f}",
+            "regular_hours": f"{pay_data['reg_hours']:.2f}",
+            "overtime_hours": f"{pay_data['ot_hours']:.2f}",
+            "allowance": f"{pay_data['allowance']:.2f}",
+            "deduction": f"{pay_data['deduction']:.2f}",
+            "gross": f"{pay_data['gross']:.2f}",
+            "net": f"{pay_data['net']:.2f}"
+        }
+
+
+def _iter_attendance_history_rows(employee, records):
+    """Yield attendance history rows for one employee"""
+    for e in records:
+        yield {
+            "emp_id": employee.emp_id,
+            "emp_name": employee.name,
+            "date": e.date,
+            "sign_in": epoch_datetime(e.sign_in) or "N/A",
+            "sign_out": epoch_datetime(e.sign_out) or "N/A",
+            "hours": f"{float(e.hours or 0):.2f}"
+        }
+
+
+def _iter_overtime_rows(month, attendance, names):
+    """Yield a row for every attendance entry in the month with overtime.
+
+    attendance is the month's AttendanceColumns; only overtime rows are
+    turned into dicts.
+    """
+    for emp_id, day, _, _, hours in attendance:
+        if hours > REGULAR_HOURS_PER_DAY:
+            ot = round(hours - REGULAR_HOURS_PER_DAY, 2)
+            yield {
+                "emp_id": emp_id,
+                "name": names.get(emp_id, f"Employee {emp_id}"),
+                "date": ordinal_date(day),
+                "hours": f"{hours:.2f}",
+                "overtime_hours": f"{ot:.2f}"
+            }
+
+
+def _iter_daily_attendance_rows(day, employees, attendance):
+    """Yield a row for every employee (present or absent) on a day (ordinal)"""
     # Include ALL employees, not just those with attendance
     for emp in employees:
-        emp_id = emp["emp_id"]
-        entry = next((a for a in attendance if a.get("emp_id") == emp_id and a.get("date") == date_str), None)
+        emp_id = emp.emp_id
+        entry = attendance.find(emp_id, day)
         
         if entry:
-            sign_in = entry.get("sign_in") or "Absent"
-            sign_out = entry.get("sign_out") or "Absent"
-            hours = f"{float(entry.get('hours', 0)):.2f}"
+            sign_in = epoch_datetime(entry.sign_in) or "Absent"
+            sign_out = epoch_datetime(entry.sign_out) or "Absent"
+            hours = f"{float(entry.hours or 0):.2f}"
         else:
             sign_in = "Absent"
             sign_out = "Absent"
             hours = "0.00"
         
-        rows.append({
+        yield {
             "emp_id": emp_id,
-            "name": emp["name"],
+            "name": emp.name,
             "sign_in": sign_in,
             "sign_out": sign_out,
             "hours": hours
-        })
+        }
 
-    # Display preview
-    _print_daily_attendance_preview(date_str, rows)
-    
-    # Ask for export format
-    export_choice = input("\nExport as (1) CSV, (2) PDF, or (3) Skip: ").strip()
-    
-    if export_choice == "1":
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_filename = f"daily_summary_{date_str.replace('-', '')}_{timestamp}.csv"
-        path = save_csv(default_filename, fieldnames, rows, use_dialog=True)
-        if path:
-            print(f"{GREEN}✓ Daily attendance summary exported: {path}{RESET}")
-        return path
-    elif export_choice == "2":
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_filename = f"daily_summary_{date_str.replace('-', '')}_{timestamp}.pdf"
-        lines = _build_daily_attendance_lines(date_str, rows)
-        path = save_pdf(default_filename, f"Daily Attendance Summary - {date_str}", lines, use_dialog=True)
-        if path:
-            print(f"{GREEN}✓ Daily attendance summary exported: {path}{RESET}")
-        return path
-    else:
-        print("Report generation complete (not exported)")
 
 # ========== PREVIEW PRINT FUNCTIONS ==========
 
+def _print_more_rows(count):
+    """Note how many rows were left out of a preview"""
+    if count > PREVIEW_ROWS:
+        print(f"... {count - PREVIEW_ROWS} more rows not shown (totals include all rows)")
+
+
 def _print_monthly_payroll_preview(month, rows):
     """Display monthly payroll preview on screen"""
     print("\n" + "="*120)
@@ -306,16 +310,20 @@ def _print_monthly_payroll_preview(month, rows):
     print(f"{'ID':<5} {'Name':<20} {'Dept':<15} {'Rate':<10} {'Reg Hrs':<10} {'OT Hrs':<10} {'Allowance':<12} {'Gross':<12} {'Net':<12}")
     print("-"*120)
     
+    count = 0
     total_gross = 0
     total_net = 0
     
     for r in rows:
-        print(f"{r['id']:<5} {r['name']:<20} {r['department']:<15} ₱{r['rate']:<9} "
-              f"{r['regular_hours']:<10} {r['overtime_hours']:<10} ₱{r['allowance']:<11} "
-              f"₱{r['gross']:<11} ₱{r['net']:<11}")
+        count += 1
+        if count <= PREVIEW_ROWS:
+            print(f"{r['id']:<5} {r['name']:<20} {r['department']:<15} ₱{r['rate']:<9} "
+                  f"{r['regular_hours']:<10} {r['overtime_hours']:<10} ₱{r['allowance']:<11} "
+                  f"₱{r['gross']:<11} ₱{r['net']:<11}")
         total_gross += float(r['gross'])
         total_net += float(r['net'])
     
+    _print_more_rows(count)
     print("="*120)
     print(f"{'TOTAL':<70} ₱{total_gross:<11.2f} ₱{total_net:<11.2f}")
     print("="*120)
@@ -324,16 +332,20 @@ def _print_monthly_payroll_preview(month, rows):
 def _print_attendance_history_preview(employee, rows):
     """Display attendance history preview on screen"""
     print("\n" + "="*90)
-    print(f"{BOLD}ATTENDANCE HISTORY - {employee['name'].upper()} (ID: {employee['emp_id']}){RESET}")
+    print(f"{BOLD}ATTENDANCE HISTORY - {employee.name.upper()} (ID: {employee.emp_id}){RESET}")
     print("="*90)
     print(f"{'Date':<15} {'Sign In':<15} {'Sign Out':<15} {'Hours':<10}")
     print("-"*90)
     
+    count = 0
     total_hours = 0
     for r in rows:
-        print(f"{r['date']:<15} {r['sign_in']:<15} {r['sign_out']:<15} {r['hours']:<10}")
+        count += 1
+        if count <= PREVIEW_ROWS:
+            print(f"{r['date']:<15} {r['sign_in']:<15} {r['sign_out']:<15} {r['hours']:<10}")
         total_hours += float(r['hours'])
     
+    _print_more_rows(count)
     print("="*90)
     print(f"Total Hours Worked: {total_hours:.2f}")
     print("="*90)
@@ -347,11 +359,15 @@ def _print_overtime_report_preview(month, rows):
     print(f"{'ID':<6} {'Name':<20} {'Date':<15} {'Total Hours':<15} {'Overtime Hours':<15}")
     print("-"*100)
     
+    count = 0
     total_ot = 0
     for r in rows:
-        print(f"{r['emp_id']:<6} {r['name']:<20} {r['date']:<15} {r['hours']:<15} {r['overtime_hours']:<15}")
+        count += 1
+        if count <= PREVIEW_ROWS:
+            print(f"{r['emp_id']:<6} {r['name']:<20} {r['date']:<15} {r['hours']:<15} {r['overtime_hours']:<15}")
         total_ot += float(r['overtime_hours'])
     
+    _print_more_rows(count)
     print("="*100)
     print(f"Total Overtime Hours: {total_ot:.2f}")
     print("="*100)
@@ -365,17 +381,21 @@ def _print_daily_attendance_preview(date_str, rows):
     print(f"{'ID':<6} {'Name':<20} {'Sign In':<15} {'Sign Out':<15} {'Hours':<10}")
     print("-"*90)
     
+    count = 0
     present_count = 0
     total_hours = 0
     
     for r in rows:
-        print(f"{r['emp_id']:<6} {r['name']:<20} {r['sign_in']:<15} {r['sign_out']:<15} {r['hours']:<10}")
+        count += 1
+        if count <= PREVIEW_ROWS:
+            print(f"{r['emp_id']:<6} {r['name']:<20} {r['sign_in']:<15} {r['sign_out']:<15} {r['hours']:<10}")
         if r['sign_in'] != "Absent":
             present_count += 1
             total_hours += float(r['hours'])
     
+    _print_more_rows(count)
     print("="*90)
-    print(f"Employees Present: {present_count}/{len(rows)}")
+    print(f"Employees Present: {present_count}/{count}")
     print(f"Total Hours: {total_hours:.2f}")
     print("="*90)
 
@@ -383,20 +403,19 @@ def _print_daily_attendance_preview(date_str, rows):
 # ========== PDF LINE BUILDERS ==========
 
 def _build_monthly_payroll_lines(month, rows):
-    """Build lines for monthly payroll PDF with improved spacing"""
-    lines = []
-    lines.append("")
-    lines.append(
+    """Yield lines for monthly payroll PDF with improved spacing"""
+    yield ""
+    yield (
         f"{'ID':<6} {'Name':<22} {'Dept':<18} {'Rate':<10} "
         f"{'Reg Hrs':<10} {'OT Hrs':<10} {'Allow':<12} {'Gross':<12} {'Net':<12}"
     )
-    lines.append("-" * 120)
+    yield "-" * 120
 
     total_gross = 0
     total_net = 0
 
     for r in rows:
-        lines.append(
+        yield (
             f"{r['id']:<6} {r['name']:<22} {r['department']:<18} {r['rate']:<10} "
             f"{r['regular_hours']:<10} {r['overtime_hours']:<10} {r['allowance']:<12} "
             f"{r['gross']:<12} {r['net']:<12}"
@@ -404,71 +423,61 @@ def _build_monthly_payroll_lines(month, rows):
         total_gross += float(r['gross'])
         total_net += float(r['net'])
 
-    lines.append("")
-    lines.append(f"TOTALS: Gross={total_gross:.2f}, Net={total_net:.2f}")
-    return lines
+    yield ""
+    yield f"TOTALS: Gross={total_gross:.2f}, Net={total_net:.2f}"
 
 
 
 def _build_attendance_history_lines(employee, rows):
-    """Build lines for attendance history PDF (fixed spacing)"""
-    lines = []
-    lines.append("")
-    lines.append(f"Employee: {employee['name']} (ID: {employee['emp_id']})")
-    lines.append("")
-    lines.append(f"{'Date':<18} {'Sign In':<18} {'Sign Out':<18} {'Hours':<10}")
-    lines.append("-" * 80)
+    """Yield lines for attendance history PDF (fixed spacing)"""
+    yield ""
+    yield f"Employee: {employee.name} (ID: {employee.emp_id})"
+    yield ""
+    yield f"{'Date':<18} {'Sign In':<18} {'Sign Out':<18} {'Hours':<10}"
+    yield "-" * 80
 
     total_hours = 0
 
     for r in rows:
-        lines.append(
-            f"{r['date']:<18} {r['sign_in']:<18} {r['sign_out']:<18} {r['hours']:<10}"
-        )
+        yield f"{r['date']:<18} {r['sign_in']:<18} {r['sign_out']:<18} {r['hours']:<10}"
         total_hours += float(r['hours'])
 
-    lines.append("")
-    lines.append(f"Total Hours Worked: {total_hours:.2f}")
-    return lines
+    yield ""
+    yield f"Total Hours Worked: {total_hours:.2f}"
 
 
 def _build_overtime_report_lines(month, rows):
-    """Build lines for overtime report PDF (fixed spacing)"""
-    lines = []
-    lines.append("")
-    lines.append(
-        f"{'ID':<6} {'Name':<22} {'Date':<18} {'Total Hrs':<14} {'OT Hrs':<14}"
-    )
-    lines.append("-" * 90)
+    """Yield lines for overtime report PDF (fixed spacing)"""
+    yield ""
+    yield f"{'ID':<6} {'Name':<22} {'Date':<18} {'Total Hrs':<14} {'OT Hrs':<14}"
+    yield "-" * 90
 
     total_ot = 0
 
     for r in rows:
-        lines.append(
+        yield (
             f"{r['emp_id']:<6} {r['name']:<22} {r['date']:<18} "
             f"{r['hours']:<14} {r['overtime_hours']:<14}"
         )
         total_ot += float(r['overtime_hours'])
 
-    lines.append("")
-    lines.append(f"Total Overtime Hours: {total_ot:.2f}")
-    return lines
+    yield ""
+    yield f"Total Overtime Hours: {total_ot:.2f}"
 
 
 def _build_daily_attendance_lines(date_str, rows):
-    """Build lines for daily attendance PDF (fixed spacing)"""
-    lines = []
-    lines.append("")
-    lines.append(
-        f"{'ID':<6} {'Name':<22} {'Sign In':<18} {'Sign Out':<18} {'Hours':<10}"
-    )
-    lines.append("-" * 90)
+    """Yield lines for daily attendance PDF (fixed spacing)"""
+    yield ""
+    yield f"{'ID':<6} {'Name':<22} {'Sign In':<18} {'Sign Out':<18} {'Hours':<10}"
+    yield "-" * 90
 
+    count = 0
     present_count = 0
     total_hours = 0
 
     for r in rows:
-        lines.append(
+        count += 1
+        yield (
             f"{r['emp_id']:<6} {r['name']:<22} {r['sign_in']:<18} "
             f"{r['sign_out']:<18} {r['hours']:<10}"
         )
@@ -477,7 +486,6 @@ def _build_daily_attendance_lines(date_str, rows):
             present_count += 1
             total_hours += float(r['hours'])
 
-    lines.append("")
-    lines.append(f"Employees Present: {present_count}/{len(rows)}")
-    lines.append(f"Total Hours: {total_hours:.2f}")
-    return lines
+    yield ""
+    yield f"Employees Present: {present_count}/{count}"
+    yield f"Total Hours: {total_hours:.2f}"
@@ -0,0 +1,75 @@
+"""Size and save/load time of each data format on generated data.
+
+Run from the project root:  python tools/bench_formats.py [--employees 5000]
+
+The data is a month of attendance (22 working days for every employee, as an
+attendance snapshot) and the employee list. msgpack is measured only when it
+is installed.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import DEPARTMENTS
+from models import date_ordinal, ordinal_date, datetime_epoch
+from utils.data_handler import DATA_FORMATS, load_data, save_data, clear_cache, _load_msgpack
+
+RUNS = 5
+
+
+def _datasets(employee_count):
+    depts = list(DEPARTMENTS)
+    employees = [{"emp_id": i, "name": f"Employee {i}", "role": DEPARTMENTS[depts[i % len(depts)]][0],
+                  "dept": depts[i % len(depts)], "rate": 100.0 + i % 50, "contact": f"0917{i:07d}"}
+                 for i in range(1, employee_count + 1)]
+    first_day = date_ordinal("10-01-2026")
+    records = []
+    for day in range(first_day, first_day + 31):
+        if (day % 7) in (0, 6):  # Sunday, Saturday
+            continue
+        start = datetime_epoch(f"{ordinal_date(day)} 08:00:00")
+        for emp in employees:
+            hours = 8 + emp["emp_id"] % 4 * 0.75
+            records.append({"emp_id": emp["emp_id"], "day": day, "sign_in": start,
+                            "sign_out": start + int(hours * 3600), "hours": hours})
+    return {"attendance month": {"log_offset": 0, "records": records}, "employees": employees}
+
+
+def _time(func, setup=None):
+    times = []
+    for _ in range(RUNS):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data file formats")
+    parser.add_argument("--employees", type=int, default=5000)
+    args = parser.parse_args()
+
+    formats = [f for f in DATA_FORMATS if f != "msgpack" or _load_msgpack()]
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, data in _datasets(args.employees).items():
+            print(f"\n{name}")
+            print(f"{'format':<10} {'size':>14} {'save':>10} {'load':>10}")
+            for data_format in formats:
+                path = os.path.join(tmp, f"{data_format}.data")
+                save_ms = _time(lambda: save_data(path, data, data_format))
+                # save_data fills the parse cache; time the read and decode, not a cache hit
+                load_ms = _time(lambda: load_data(path), setup=clear_cache)
+                assert load_data(path) == data
+                print(f"{data_format:<10} {os.path.getsize(path):>14,} {save_ms:>8.1f}ms {load_ms:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""Benchmark the service paths on generated data at several scales.
+
+Run from the project root:
+    python tools/bench_services.py --scales 100x3 1000x12 --out bench.json
+    python tools/bench_services.py --scales 100x3 1000x12 --baseline bench.json
+
+Each scale is EMPLOYEESxMONTHS of data made by tools/generate_data.py in a
+scratch directory, with the storage backend in config.py. Every path below
+runs --runs times with input()/getpass() answered and file dialogs pointed at
+the scratch directory; the report is the median wall time, throughput (items
+per second) and the peak memory traced in one more run. Payroll is computed
+cold each time (the payroll cache is cleared first). Results are written to
+--out as JSON; with --baseline each time is compared against an earlier
+result and the exit status is 1 if any is more than --tolerance percent slower.
+"""
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import HR_PASSWORD, PAYROLL_CACHE_DIR, STORAGE_BACKEND
+from generate_data import generate, months_from
+from models import ordinal_date
+from utils.attendance_store import partition_days, partition_for_month
+import utils.storage
+
+FIRST_MONTH = "01-2026"
+# Employees signing in and out in the sign_in/sign_out cases
+PUNCHES = 200
+
+
+@contextlib.contextmanager
+def _answers(answers):
+    """Answer input() and getpass() prompts from answers, in order, with output discarded"""
+    answers = iter(answers)
+    reply = lambda prompt="": next(answers)
+    with mock.patch.object(builtins, "input", reply), mock.patch("utils.security.getpass", reply), \
+            contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def _clear_payroll_cache():
+    shutil.rmtree(PAYROLL_CACHE_DIR, ignore_errors=True)
+
+
+def _punch_all(punch, emp_ids):
+    for emp_id in emp_ids:
+        with _answers([str(emp_id)]):
+            punch()
+
+
+def _cases(employees, month):
+    """[(name, run, items, reset)] for the data in the current directory"""
+    from services import attendance_service, payroll_service, report_service
+    from utils.export_helpers import save_csv, save_pdf
+
+    repo = utils.storage.get_repository()
+    emp_list = repo.load_employees()
+    first_day, _ = partition_days(partition_for_month(month))
+    day = next(d for d in range(first_day, first_day + 7) if d % 7 not in (0, 6))
+    date_str = ordinal_date(day)
+    emp_id = emp_list[0].emp_id
+    inputs = {x["emp_id"]: x for x in repo.load_payroll_inputs() if x["month"] == month}
+    punch_ids = [emp.emp_id for emp in emp_list[:PUNCHES]]
+
+    def calculate_pay():
+        attendance = repo.load_attendance([partition_for_month(month)]).records
+        for emp in emp_list:
+            payroll_service.calculate_pay(emp, attendance, inputs.get(emp.emp_id, {}), month)
+
+    def interactive(func, *answers):
+        def run():
+            with _answers([HR_PASSWORD, *answers]):
+                func()
+        return run
+
+    payroll_report = report_service.build_monthly_payroll_report(month)
+    history = report_service.build_attendance_history_report(emp_id)
+    overtime = report_service.build_overtime_report(month)
+    history_rows = sum(1 for _ in history.rows())
+    overtime_rows = sum(1 for _ in overtime.rows())
+    lines = sum(1 for _ in payroll_report.lines())
+
+    return [
+        ("calculate_pay", calculate_pay, employees, None),
+        ("generate_payroll", interactive(payroll_service.generate_payroll, month), employees, _clear_payroll_cache),
+        ("export_monthly_payroll", interactive(report_service.export_monthly_payroll, month, "1"),
+         employees, _clear_payroll_cache),
+        ("export_individual_attendance", interactive(report_service.export_individual_attendance,
+                                                     str(emp_id), "1"), history_rows, None),
+        ("export_overtime_report", interactive(report_service.export_overtime_report, month, "1"),
+         overtime_rows, None),
+        ("export_daily_attendance_summary", interactive(report_service.export_daily_attendance_summary,
+                                                        date_str, "1"), employees, None),
+        ("save_csv", lambda: save_csv("bench/payroll.csv", payroll_report.fieldnames, payroll_report.rows()),
+         employees, None),
+        ("save_pdf", lambda: save_pdf("bench/payroll.pdf", payroll_report.title, payroll_report.lines()),
+         lines, None),
+        ("sign_in", lambda: _punch_all(attendance_service.sign_in, punch_ids), len(punch_ids),
+         lambda: _punch_all(attendance_service.sign_out, punch_ids)),
+        ("sign_out", lambda: _punch_all(attendance_service.sign_out, punch_ids), len(punch_ids),
+         lambda: _punch_all(attendance_service.sign_in, punch_ids)),
+    ]
+
+
+def _measure(run, reset, runs):
+    """(median seconds, peak traced bytes) of run"""
+    times = []
+    for _ in range(runs):
+        if reset:
+            reset()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    if reset:
+        reset()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+def bench_scale(employees, months, runs):
+    """{case: {"items", "seconds", "per_second", "peak_kib"}} on freshly generated data"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        utils.storage._repository = None
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate(employees, months, FIRST_MONTH)
+            month = months_from(FIRST_MONTH, months)[-1]
+            out_dir = os.path.join(tmp, "bench")
+            with mock.patch("utils.export_helpers.get_save_location",
+                            lambda filename, file_type="CSV": os.path.join(out_dir, filename)):
+                results = _bench_cases(employees, month, runs)
+        finally:
+            repo = utils.storage._repository
+            if hasattr(repo, "conn"):
+                repo.conn.close()
+            utils.storage._repository = None
+            os.chdir(cwd)
+    return results
+
+
+def _bench_cases(employees, month, runs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        cases = _cases(employees, month)
+    results = {}
+    for name, run, items, reset in cases:
+        seconds, peak = _measure(run, reset, runs)
+        results[name] = {"items": items, "seconds": round(seconds, 6),
+                         "per_second": round(items / seconds, 1) if seconds else None,
+                         "peak_kib": round(peak / 1024, 1)}
+        print(f"  {name:<32} {seconds * 1000:10.1f} ms {items / seconds if seconds else 0:12.0f}/s "
+              f"{peak / 1024 / 1024:9.1f} MiB")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print each time against the baseline's; returns the cases more than tolerance percent slower"""
+    slower = []
+    print(f"\nAgainst baseline from {baseline.get('created', '?')}:")
+    for scale, cases in results["scales"].items():
+        for name, result in cases.items():
+            before = baseline.get("scales", {}).get(scale, {}).get(name)
+            if not before or not before["seconds"]:
+                continue
+            change = (result["seconds"] / before["seconds"] - 1) * 100
+            print(f"  {scale:<10} {name:<32} {before['seconds'] * 1000:10.1f} -> "
+                  f"{result['seconds'] * 1000:10.1f} ms  {change:+6.1f}%")
+            if change > tolerance:
+                slower.append((scale, name))
+    return slower
+
+
+def _scale(value):
+    try:
+        employees, months = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid scale {value!r}, use EMPLOYEESxMONTHS")
+    return employees, months
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", nargs="+", type=_scale, default=[(100, 3), (500, 6)],
+                        help="EMPLOYEESxMONTHS, default 100x3 500x6")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--out", default="bench_results.json", help="default bench_results.json")
+    parser.add_argument("--baseline", help="earlier --out file to compare against")
+    parser.add_argument("--tolerance", type=float, default=25.0, help="percent slower that fails, default 25")
+    args = parser.parse_args()
+
+    results = {"created": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+               "backend": STORAGE_BACKEND, "runs": args.runs, "scales": {}}
+    for employees, months in args.scales:
+        print(f"{employees} employees x {months} months")
+        results["scales"][f"{employees}x{months}"] = bench_scale(employees, months, args.runs)
+
+    with open(args.out, "w") as file:
+        json.dump(results, file, indent=4)
+    print(f"Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            slower = compare(results, json.load(file), args.tolerance)
+        if slower:
+            print(f"{len(slower)} slower than the baseline by more than {args.tolerance:g}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
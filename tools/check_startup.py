@@ -0,0 +1,54 @@
+"""Measure the import cost of the sign-in path against config.STARTUP_BUDGET_MS.
+
+Run from the project root:  python tools/check_startup.py
+Exits non-zero if the budget is exceeded or if a GUI/PDF toolkit is loaded
+on the way to sign_in.
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import STARTUP_BUDGET_MS
+
+SIGN_IN_PATH = "import main, services.attendance_service"
+HEAVY_MODULES = ("tkinter", "reportlab", "sqlite3")
+RUNS = 7
+
+# Runs in a fresh interpreter: time the sign-in imports, then list heavy modules loaded
+PROBE = f"""
+import sys, time
+start = time.perf_counter()
+{SIGN_IN_PATH}
+elapsed = (time.perf_counter() - start) * 1000
+print(elapsed, *[m for m in {HEAVY_MODULES!r} if m in sys.modules])
+"""
+
+
+def _probe():
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, check=True,
+                         capture_output=True, text=True).stdout.split()
+    return float(out[0]), out[1:]
+
+
+def main():
+    results = [_probe() for _ in range(RUNS)]
+    cost = statistics.median(ms for ms, _ in results)
+    loaded = sorted({m for _, modules in results for m in modules})
+
+    print(f"Sign-in imports : {cost:7.1f} ms median of {RUNS} runs (budget {STARTUP_BUDGET_MS} ms)")
+    if loaded:
+        print(f"Heavy modules loaded on the sign-in path: {', '.join(loaded)}")
+
+    if cost > STARTUP_BUDGET_MS or loaded:
+        print("FAIL")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
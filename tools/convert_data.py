@@ -0,0 +1,56 @@
+"""Convert the data files to another format (see DATA_FORMAT in config.py).
+
+Run from the project root:
+    python tools/convert_data.py --to msgpack
+    python tools/convert_data.py --to json employees.json
+
+Without file names it converts the employees, payroll inputs and every
+attendance snapshot and totals file. Files are read in whatever format they
+are in; attendance journals are append-only logs and stay JSON Lines. Set
+DATA_FORMAT to the same format so later saves keep it.
+"""
+import argparse
+import glob
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import EMPLOYEE_FILE, PAYROLL_INPUTS_FILE, ATTENDANCE_DIR, DATA_FORMAT
+from utils.data_handler import DATA_FORMATS, decode, save_data, _load_msgpack
+
+
+def data_files():
+    """Every data file save_data writes, that exists"""
+    files = [EMPLOYEE_FILE, PAYROLL_INPUTS_FILE] + sorted(glob.glob(os.path.join(ATTENDANCE_DIR, "*.json")))
+    return [path for path in files if os.path.exists(path)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert data files between formats")
+    parser.add_argument("--to", required=True, choices=DATA_FORMATS, help="format to write")
+    parser.add_argument("files", nargs="*", help="files to convert, default all data files")
+    args = parser.parse_args()
+    if args.to == "msgpack" and not _load_msgpack():
+        parser.error("msgpack is not installed; install it with: pip install msgpack")
+
+    before_total = after_total = 0
+    for path in args.files or data_files():
+        before = os.path.getsize(path)
+        # decode() rather than load_data(): an unreadable file must stop the run, not be saved as []
+        with open(path, "rb") as file:
+            data = decode(file.read())
+        save_data(path, data, args.to)
+        after = os.path.getsize(path)
+        before_total += before
+        after_total += after
+        print(f"{path:<40} {before:>12,} -> {after:>12,} bytes")
+
+    print(f"{'Total':<40} {before_total:>12,} -> {after_total:>12,} bytes")
+    if args.to != DATA_FORMAT:
+        print(f"Note: DATA_FORMAT in config.py is {DATA_FORMAT!r}; files are rewritten in it on their next save.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Generate a synthetic dataset: employees across config.DEPARTMENTS and months of attendance.
+
+Run from the project root:
+    python tools/generate_data.py --employees 1000 --months 12 --dir /tmp/quickhire_1000
+
+Data is written through the storage backend in config.py, into --dir (the
+data file paths are relative, so they land there). Every weekday each
+employee is present with ATTENDANCE_RATE; some days run into overtime and
+a few have no sign-out. Payroll inputs are prepared for every month. The
+same --seed always gives the same data.
+"""
+import argparse
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import DEPARTMENTS
+from models import Employee, datetime_epoch, ordinal_date
+from services.attendance_service import _worked_hours
+from utils.attendance_store import partition_days, partition_for_month
+
+ATTENDANCE_RATE = 0.95
+OVERTIME_RATE = 0.15
+MISSING_SIGN_OUT_RATE = 0.02
+
+FIRST_NAMES = ("Ana", "Ben", "Carla", "Dan", "Ella", "Felix", "Grace", "Hugo", "Ivy", "Jon", "Kim", "Luis")
+LAST_NAMES = ("Reyes", "Santos", "Cruz", "Garcia", "Lim", "Tan", "Bautista", "Ramos", "Flores", "Mendoza")
+
+
+def months_from(first_month, count):
+    """count consecutive MM-YYYY months starting at first_month"""
+    month, year = int(first_month[:2]), int(first_month[3:])
+    months = []
+    for _ in range(count):
+        months.append(f"{month:02d}-{year}")
+        month, year = (1, year + 1) if month == 12 else (month + 1, year)
+    return months
+
+
+def make_employees(count, rng, first_id=1):
+    depts = list(DEPARTMENTS)
+    employees = []
+    for emp_id in range(first_id, first_id + count):
+        dept = depts[emp_id % len(depts)]
+        employees.append(Employee(emp_id, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                                  rng.choice(DEPARTMENTS[dept]), dept, float(rng.randrange(80, 400)),
+                                  f"09{rng.randrange(10**9):09d}"))
+    return employees
+
+
+def month_events(employees, month, rng):
+    """Attendance "add" events for every employee on every weekday of a month"""
+    first_day, end_day = partition_days(partition_for_month(month))
+    events = []
+    for day in range(first_day, end_day):
+        if day % 7 in (0, 6):
+            continue  # Sunday, Saturday
+        midnight = datetime_epoch(f"{ordinal_date(day)} 00:00:00")
+        for emp in employees:
+            if rng.random() >= ATTENDANCE_RATE:
+                continue
+            sign_in = midnight + rng.randrange(7 * 3600 + 1800, 9 * 3600 + 900)
+            if rng.random() < MISSING_SIGN_OUT_RATE:
+                sign_out, hours = None, 0.0
+            else:
+                worked = rng.randrange(9 * 3600, 12 * 3600) if rng.random() < OVERTIME_RATE \
+                    else rng.randrange(7 * 3600 + 1800, 8 * 3600 + 1800)
+                sign_out = sign_in + worked
+                hours = _worked_hours(sign_in, sign_out)
+            events.append({"op": "add", "emp_id": emp.emp_id, "day": day,
+                           "sign_in": sign_in, "sign_out": sign_out, "hours": hours})
+    return events
+
+
+def generate(employee_count, month_count, first_month="01-2026", seed=0):
+    """Write the dataset through the current repository; returns (employees, attendance records)"""
+    from utils.storage import get_repository
+
+    rng = random.Random(seed)
+    repo = get_repository()
+    employees = make_employees(employee_count, rng, repo.next_employee_id())
+    repo.add_employees(employees)
+
+    records = 0
+    payroll_inputs = list(repo.load_payroll_inputs() or [])
+    for month in months_from(first_month, month_count):
+        events = month_events(employees, month, rng)
+        repo.load_attendance([]).record_many(events)
+        records += len(events)
+        payroll_inputs += [{"emp_id": emp.emp_id, "month": month,
+                            "allowance": float(rng.randrange(0, 3000, 100)),
+                            "deduction": float(rng.randrange(0, 1500, 50))} for emp in employees]
+    repo.save_payroll_inputs(payroll_inputs)
+    return len(employees), records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--first-month", default="01-2026", help="MM-YYYY, default 01-2026")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dir", default=".", help="directory to write the data files in, default the current one")
+    args = parser.parse_args()
+
+    if partition_for_month(args.first_month) is None:
+        parser.error(f"invalid month {args.first_month!r}, use MM-YYYY")
+    os.makedirs(args.dir, exist_ok=True)
+    os.chdir(args.dir)
+    employees, records = generate(args.employees, args.months, args.first_month, args.seed)
+    print(f"{employees} employees and {records} attendance records written to {os.path.abspath('.')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Load generator for the punch service: shift change at a bank of kiosks.
+
+Start the service, then run from the project root:
+    python main.py serve
+    python tools/punch_load.py --connections 200 --employees 5000
+
+Each connection signs employees in, then out, over one kept-alive HTTP
+connection. Prints throughput and p50/p99 latency for each phase. Employee
+IDs start at --first-id so a run does not collide with real staff.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import PUNCH_SERVICE_HOST, PUNCH_SERVICE_PORT
+
+
+async def _request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: kiosk\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = next(int(line.split(b":", 1)[1]) for line in head.split(b"\r\n")
+                  if line.lower().startswith(b"content-length:"))
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def _kiosk(host, port, emp_ids, path, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for emp_id in emp_ids:
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, "POST", path, {"emp_id": emp_id})
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def _phase(host, port, path, emp_ids, connections):
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(_kiosk(host, port, emp_ids[i::connections], path, latencies, statuses)
+                           for i in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{path:<10} {len(latencies):>7} punches in {elapsed:6.2f}s  {len(latencies) / elapsed:8.0f} punches/s"
+          f"  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  status {statuses}")
+
+
+async def _run(args):
+    emp_ids = list(range(args.first_id, args.first_id + args.employees))
+    await _phase(args.host, args.port, "/sign-in", emp_ids, args.connections)
+    await _phase(args.host, args.port, "/sign-out", emp_ids, args.connections)
+
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    _, metrics = await _request(reader, writer, "GET", "/metrics")
+    writer.close()
+    print("Writer: " + ", ".join(f"{name} {value:.1f}" if isinstance(value, float) else f"{name} {value}"
+                                 for name, value in metrics.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=PUNCH_SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=PUNCH_SERVICE_PORT)
+    parser.add_argument("--connections", type=int, default=100, help="concurrent kiosks")
+    parser.add_argument("--employees", type=int, default=2000, help="employees signing in and out")
+    parser.add_argument("--first-id", type=int, default=900000)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Read-only binary copy of the attendance history for random access.
+
+attendance.bin holds fixed-width little-endian records grouped by month, in
+the order they are stored, so a month is one contiguous slice;
+attendance.bin.idx is its sidecar index:
+
+    header   magic, build id, record count, month count, employee count
+    months   (YYYY-MM as year * 12 + month - 1, first record, end record,
+              snapshot and journal (mtime_ns, size) when archived), sorted
+    emps     (emp_id, first position, end position), sorted
+    order    record numbers sorted by (emp_id, day), stored order within a day
+
+Both files are read through mmap and sliced with memoryview, so a lookup
+only unpacks the index entries it bisects over and the records it returns.
+A month whose JSON files changed after it was archived is not used.
+"""
+import mmap
+import os
+import struct
+import time
+from bisect import bisect_left
+from models import NO_TIME
+from utils.attendance_store import partition_files
+
+ARCHIVE_MAGIC = b"QHATTBIN"
+INDEX_MAGIC = b"QHATTIDX"
+
+# emp_id, day ordinal, sign-in and sign-out epoch seconds (NO_TIME if missing), hours * 100
+RECORD = struct.Struct("<iiqqi")
+_DATA_HEADER = struct.Struct("<8sqq")
+_INDEX_HEADER = struct.Struct("<8sqqqq")
+_MONTH = struct.Struct("<iiiqqqq")
+_EMP = struct.Struct("<iii")
+_POSITION = struct.Struct("<i")
+
+# (mtime_ns, size) of a missing file
+_ABSENT = (-1, -1)
+
+
+def _month_key(partition):
+    return int(partition[:4]) * 12 + int(partition[5:]) - 1
+
+
+def _key_partition(key):
+    return f"{key // 12:04d}-{key % 12 + 1:02d}"
+
+
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return _ABSENT
+    return stat.st_mtime_ns, stat.st_size
+
+
+def partition_stamp(partition):
+    """(mtime_ns, size) of a partition's snapshot and active journal, flattened"""
+    snapshot, journal = partition_files(partition)
+    return _file_stamp(snapshot) + _file_stamp(journal)
+
+
+def _centi_hours(hours):
+    """hours * 100 as an int, or None if that would round the stored value"""
+    centi = round(float(hours or 0) * 100)
+    return centi if centi / 100 == float(hours or 0) else None
+
+
+def write_archive(path, partitions):
+    """Write the archive and its index from {partition: (stamp, rows)}, rows as AttendanceColumns.
+
+    Returns the partitions left out because an hours value has more than two
+    decimals (those are always read from JSON). Both files are written under
+    temporary names and renamed, the data file last.
+    """
+    records = []
+    months = []
+    skipped = []
+    for partition in sorted(partitions):
+        stamp, rows = partitions[partition]
+        packed = []
+        for emp_id, day, sign_in, sign_out, hours in rows:
+            centi = _centi_hours(hours)
+            if centi is None:
+                skipped.append(partition)
+                break
+            packed.append((emp_id, day, NO_TIME if sign_in is None else sign_in,
+                           NO_TIME if sign_out is None else sign_out, centi))
+        else:
+            months.append((_month_key(partition), len(records), len(records) + len(packed)) + tuple(stamp))
+            records.extend(packed)
+
+    order = sorted(range(len(records)), key=lambda i: (records[i][0], records[i][1], i))
+
+    emps = []
+    for position, record_number in enumerate(order):
+        emp_id = records[record_number][0]
+        if emps and emps[-1][0] == emp_id:
+            emps[-1][2] = position + 1
+        else:
+            emps.append([emp_id, position, position + 1])
+
+    build_id = time.time_ns()
+    index = bytearray(_INDEX_HEADER.pack(INDEX_MAGIC, build_id, len(records), len(months), len(emps)))
+    for month in months:
+        index += _MONTH.pack(*month)
+    for emp in emps:
+        index += _EMP.pack(*emp)
+    for record_number in order:
+        index += _POSITION.pack(record_number)
+
+    data = bytearray(_DATA_HEADER.pack(ARCHIVE_MAGIC, build_id, len(records)))
+    for record in records:
+        data += RECORD.pack(*record)
+
+    for target, raw in ((path + ".idx", index), (path, data)):
+        temp = f"{target}.{os.getpid()}.tmp"
+        with open(temp, "wb") as file:
+            file.write(raw)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, target)
+    return skipped
+
+
+def _row(record):
+    emp_id, day, sign_in, sign_out, centi = record
+    return (emp_id, day, None if sign_in == NO_TIME else sign_in,
+            None if sign_out == NO_TIME else sign_out, centi / 100)
+
+
+class _Table:
+    """Fixed-width entries of a memoryview as a sequence bisect can search by first field"""
+
+    def __init__(self, view, entry):
+        self.view = view
+        self.entry = entry
+
+    def __len__(self):
+        return len(self.view) // self.entry.size
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.entry.unpack_from(self.view, i * self.entry.size)
+
+    def find(self, key):
+        """The entry whose first field is key, or None"""
+        i = bisect_left(self, key, key=lambda entry: entry[0])
+        if i < len(self):
+            entry = self[i]
+            if entry[0] == key:
+                return entry
+        return None
+
+
+class AttendanceArchive:
+    """An open attendance.bin and its index; use open_archive()"""
+
+    def __init__(self, data_file, index_file):
+        self._files = (data_file, index_file)
+        self._maps = [mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) for f in self._files]
+        data, index = (memoryview(m) for m in self._maps)
+        _, data_build, count = _DATA_HEADER.unpack_from(data)
+        magic, index_build, index_count, month_count, emp_count = _INDEX_HEADER.unpack_from(index)
+        if magic != INDEX_MAGIC or (data_build, count) != (index_build, index_count):
+            data.release()
+            index.release()
+            for m in self._maps:
+                m.close()
+            raise ValueError("attendance archive and index do not match")
+
+        self._records = data[_DATA_HEADER.size:_DATA_HEADER.size + count * RECORD.size]
+        start = _INDEX_HEADER.size
+        self._months = _Table(index[start:start + month_count * _MONTH.size], _MONTH)
+        start += month_count * _MONTH.size
+        self._emps = _Table(index[start:start + emp_count * _EMP.size], _EMP)
+        start += emp_count * _EMP.size
+        self._order = index[start:start + count * _POSITION.size]
+        self._views = (data, index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for view in (self._records, self._months.view, self._emps.view, self._order) + self._views:
+            view.release()
+        for m in self._maps:
+            m.close()
+        for f in self._files:
+            f.close()
+
+    def __len__(self):
+        return len(self._records) // RECORD.size
+
+    def partitions(self):
+        """{partition: stamp when archived} of every month in the archive"""
+        return {_key_partition(m[0]): tuple(m[3:]) for m in self._months}
+
+    def _month(self, partition):
+        return self._months.find(_month_key(partition))
+
+    def is_current(self, partition):
+        """Whether a month is archived and its JSON files have not changed since"""
+        month = self._month(partition)
+        return month is not None and tuple(month[3:]) == partition_stamp(partition)
+
+    def month_rows(self, partition):
+        """(emp_id, day, sign_in, sign_out, hours) rows of an archived month, in stored order"""
+        month = self._month(partition)
+        if month is None:
+            return
+        for record in RECORD.iter_unpack(self._records[month[1] * RECORD.size:month[2] * RECORD.size]):
+            yield _row(record)
+
+    def employee_rows(self, emp_id):
+        """(emp_id, day, sign_in, sign_out, hours) rows of one employee, by day"""
+        emp = self._emps.find(emp_id)
+        if emp is None:
+            return
+        for (record_number,) in _POSITION.iter_unpack(self._order[emp[1] * _POSITION.size:
+                                                                  emp[2] * _POSITION.size]):
+            yield _row(RECORD.unpack_from(self._records, record_number * RECORD.size))
+
+
+def open_archive(path):
+    """The AttendanceArchive at path, or None if there is none (or it is unreadable)"""
+    try:
+        data_file = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    try:
+        index_file = open(path + ".idx", "rb")
+    except FileNotFoundError:
+        data_file.close()
+        return None
+    try:
+        header = data_file.read(_DATA_HEADER.size)
+        if len(header) < _DATA_HEADER.size or not header.startswith(ARCHIVE_MAGIC):
+            raise ValueError("not an attendance archive")
+        return AttendanceArchive(data_file, index_file)
+    except (ValueError, struct.error):
+        data_file.close()
+        index_file.close()
+        return None
\ No newline at end of file
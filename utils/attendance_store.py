@@ -0,0 +1,752 @@
+import os
+import time
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+from contextlib import contextmanager, nullcontext, ExitStack
+from datetime import date
+from models import AttendanceRecord, AttendanceColumns, upgrade_attendance, epoch_day, now_epoch
+from utils.data_handler import load_data, save_data, append_records, load_journal
+from utils.profiling import stage, count
+from config import (ATTENDANCE_DIR, ATTENDANCE_FILE, ATTENDANCE_JOURNAL_FILE, REGULAR_HOURS_PER_DAY,
+                    JOURNAL_COMPACT_BYTES, JOURNAL_COMPACT_AGE_HOURS, OPEN_SESSIONS_FILE)
+
+# A compaction lock older than this was left by a crashed process
+_STALE_LOCK_SECONDS = 600
+
+
+def partition_for_date(date):
+    """Partition key (YYYY-MM) for a MM-DD-YYYY date, or None if malformed"""
+    if len(date) != 10 or date[2] != "-" or date[5] != "-" or not date[6:].isdigit() or not date[:2].isdigit():
+        return None
+    return f"{date[6:]}-{date[:2]}"
+
+
+def partition_for_day(day):
+    """Partition key (YYYY-MM) for a day ordinal"""
+    d = date.fromordinal(day)
+    return f"{d.year:04d}-{d.month:02d}"
+
+
+def partition_days(partition):
+    """(first day, day after the last) ordinals of a YYYY-MM partition"""
+    year, month = int(partition[:4]), int(partition[5:])
+    first = date(year, month, 1).toordinal()
+    if month == 12:
+        return first, date(year + 1, 1, 1).toordinal()
+    return first, date(year, month + 1, 1).toordinal()
+
+
+def partition_for_month(month):
+    """Partition key (YYYY-MM) for a MM-YYYY month, or None if malformed"""
+    if len(month) != 7 or month[2] != "-" or not month[3:].isdigit() or not month[:2].isdigit():
+        return None
+    return f"{month[3:]}-{month[:2]}"
+
+
+def split_hours(hours):
+    """Split a day's hours into (regular, overtime)"""
+    hours = float(hours or 0)
+    if hours > REGULAR_HOURS_PER_DAY:
+        return REGULAR_HOURS_PER_DAY, hours - REGULAR_HOURS_PER_DAY
+    return hours, 0.0
+
+
+def summarize_hours(records):
+    """Group attendance records by employee in a single pass: {emp_id: [regular, overtime, days present]}"""
+    totals = {}
+    days = set()
+
+    for entry in records:
+        regular, overtime = split_hours(entry.hours)
+        emp_totals = totals.get(entry.emp_id)
+        if emp_totals is None:
+            emp_totals = totals[entry.emp_id] = [0.0, 0.0, 0]
+        emp_totals[0] += regular
+        emp_totals[1] += overtime
+        if (entry.emp_id, entry.day) not in days:
+            days.add((entry.emp_id, entry.day))
+            emp_totals[2] += 1
+
+    return totals
+
+
+def summarize_columns(columns):
+    """summarize_hours over AttendanceColumns, without building a record per row"""
+    totals = {}
+    days = set()
+
+    for emp_id, day, _, _, hours in columns:
+        regular, overtime = split_hours(hours)
+        emp_totals = totals.get(emp_id)
+        if emp_totals is None:
+            emp_totals = totals[emp_id] = [0.0, 0.0, 0]
+        emp_totals[0] += regular
+        emp_totals[1] += overtime
+        if (emp_id, day) not in days:
+            days.add((emp_id, day))
+            emp_totals[2] += 1
+
+    return totals
+
+
+def list_partitions():
+    """All partition keys present in the attendance directory, oldest first"""
+    try:
+        names = os.listdir(ATTENDANCE_DIR)
+    except FileNotFoundError:
+        return []
+    return sorted({name.split(".")[0] for name in names if name.endswith((".json", ".jsonl"))})
+
+
+def _snapshot_path(partition):
+    return os.path.join(ATTENDANCE_DIR, f"{partition}.json")
+
+
+def _journal_path(partition):
+    return os.path.join(ATTENDANCE_DIR, f"{partition}.jsonl")
+
+
+def _segment_path(partition, start):
+    return os.path.join(ATTENDANCE_DIR, f"{partition}.{start}.jsonl")
+
+
+def _lock_path(partition):
+    return os.path.join(ATTENDANCE_DIR, f"{partition}.compact.lock")
+
+
+def partition_files(partition):
+    """Files holding a partition's records: its snapshot and active journal
+    (sealed journal segments only change along with the snapshot)"""
+    return [_snapshot_path(partition), _journal_path(partition)]
+
+
+def _load_snapshot(partition):
+    """(record dicts, log offset covered) of a partition snapshot.
+
+    Snapshots from before compaction are a bare list and cover no journal.
+    """
+    data = load_data(_snapshot_path(partition))
+    if isinstance(data, list):
+        return data, 0
+    return data["records"], data["log_offset"]
+
+
+def _save_snapshot(partition, records, log_offset):
+    save_data(_snapshot_path(partition), {"log_offset": log_offset, "records": records})
+
+
+def _sealed_segments(partition):
+    """[(log offset, path)] of the sealed journal segments of a partition, oldest first"""
+    prefix = f"{partition}."
+    segments = []
+    for name in os.listdir(ATTENDANCE_DIR) if os.path.isdir(ATTENDANCE_DIR) else []:
+        start = name[len(prefix):-len(".jsonl")]
+        if name.startswith(prefix) and name.endswith(".jsonl") and start.isdigit():
+            segments.append((int(start), os.path.join(ATTENDANCE_DIR, name)))
+    return sorted(segments)
+
+
+def _totals_path(partition):
+    return os.path.join(ATTENDANCE_DIR, f"{partition}.totals.json")
+
+
+@contextmanager
+def _file_lock(path):
+    """Hold an OS lock on a lock file, waiting while another process or thread holds it.
+
+    The OS releases the lock when its holder exits, even on a crash, so a
+    lock is never broken while its holder is still working and the file is
+    left in place.
+    """
+    fd = os.open(path, os.O_CREAT | os.O_RDWR)
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.002)
+    except BaseException:
+        os.close(fd)
+        raise
+    try:
+        yield
+    finally:
+        if not fcntl:
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        os.close(fd)
+
+
+@contextmanager
+def totals_lock(partitions):
+    """Hold the totals locks of partitions, so that journal appends, the totals updates
+    they cause and compactions are not interleaved with another writer's"""
+    os.makedirs(ATTENDANCE_DIR, exist_ok=True)
+    with ExitStack() as stack:
+        for partition in sorted(set(partitions)):
+            stack.enter_context(_file_lock(os.path.join(ATTENDANCE_DIR, f"{partition}.totals.lock")))
+        yield
+
+
+def append_to_partitions(events):
+    """Append attendance events to the journals of their month partitions, one write per partition.
+
+    Callers hold totals_lock for the partitions (see compact_partition).
+    """
+    by_partition = {}
+    for event in events:
+        by_partition.setdefault(partition_for_day(event["day"]), []).append(event)
+
+    os.makedirs(ATTENDANCE_DIR, exist_ok=True)
+    for partition, partition_events in by_partition.items():
+        append_records(_journal_path(partition), partition_events)
+        if _needs_compaction(partition):
+            with stage("attendance.compact"):
+                compact_partition(partition)
+
+
+def _needs_compaction(partition):
+    """Whether the active journal has passed JOURNAL_COMPACT_BYTES, or the snapshot is older
+    than JOURNAL_COMPACT_AGE_HOURS"""
+    try:
+        journal_size = os.path.getsize(_journal_path(partition))
+    except FileNotFoundError:
+        return False
+    if journal_size >= JOURNAL_COMPACT_BYTES:
+        return True
+    try:
+        snapshot_age = time.time() - os.path.getmtime(_snapshot_path(partition))
+    except FileNotFoundError:
+        return True
+    return snapshot_age >= JOURNAL_COMPACT_AGE_HOURS * 3600
+
+
+def compact_partition(partition, rewrite=False):
+    """Fold a partition's journal into its snapshot and delete the journal segments it now covers.
+
+    The active journal is sealed (renamed to YYYY-MM.<log offset>.jsonl) so
+    new events go to a fresh one while the snapshot is written; the snapshot
+    records the log offset it covers. With rewrite, the snapshot is written
+    even if there is no journal to fold. Returns the journal bytes folded, or
+    None if another process is compacting the partition.
+
+    Callers hold totals_lock for the partition. Every journal append does
+    too, so nothing can still be appending to the journal once it is sealed,
+    and the sealed segments can be deleted as soon as the snapshot is saved.
+    """
+    try:
+        os.close(os.open(_lock_path(partition), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        try:
+            if time.time() - os.path.getmtime(_lock_path(partition)) < _STALE_LOCK_SECONDS:
+                return None
+            os.remove(_lock_path(partition))
+        except FileNotFoundError:
+            # The other compactor finished in the meantime
+            pass
+        return compact_partition(partition, rewrite)
+
+    try:
+        _, offset = _load_snapshot(partition)
+        # Segments sealed by a compaction that did not finish are folded in too
+        sealed = [(start, path) for start, path in _sealed_segments(partition) if start >= offset]
+        end = sealed[-1][0] + os.path.getsize(sealed[-1][1]) if sealed else offset
+        if os.path.exists(_journal_path(partition)) and os.path.getsize(_journal_path(partition)):
+            os.replace(_journal_path(partition), _segment_path(partition, end))
+            sealed.append((end, _segment_path(partition, end)))
+        if not sealed and not rewrite:
+            return 0
+
+        store = AttendanceStore()
+        store._load_partition(partition, active_journal=False)
+        new_offset = sealed[-1][0] + os.path.getsize(sealed[-1][1]) if sealed else offset
+        _save_snapshot(partition, [record.to_dict() for record in store.records], new_offset)
+
+        for start, path in _sealed_segments(partition):
+            if start < new_offset:
+                os.remove(path)
+        return new_offset - offset
+    finally:
+        os.remove(_lock_path(partition))
+
+
+def compact_partitions(partitions=None):
+    """compact_partition for the given partitions (all when None); returns {partition: bytes folded}"""
+    folded = {}
+    for partition in partitions if partitions is not None else list_partitions():
+        if partition is not None:
+            with totals_lock([partition]):
+                folded[partition] = compact_partition(partition)
+    return folded
+
+
+def migrate_attendance_file():
+    """Split the single-file attendance.json (and its journal) into month partitions.
+
+    Returns the number of records migrated. The old files are kept with a
+    .migrated suffix.
+    """
+    if not os.path.exists(ATTENDANCE_FILE) and not os.path.exists(ATTENDANCE_JOURNAL_FILE):
+        return 0
+
+    legacy = AttendanceStore(AttendanceRecord.from_dict(r) for r in load_data(ATTENDANCE_FILE))
+    for event in load_journal(ATTENDANCE_JOURNAL_FILE):
+        legacy.apply(_current_event(event))
+
+    by_partition = {}
+    for record in legacy.records:
+        by_partition.setdefault(partition_for_day(record.day), []).append(record.to_dict())
+
+    os.makedirs(ATTENDANCE_DIR, exist_ok=True)
+    for partition, records in by_partition.items():
+        # Keep anything already recorded in the partition
+        existing, offset = _load_snapshot(partition)
+        _save_snapshot(partition, existing + records, offset)
+        if os.path.exists(_totals_path(partition)):
+            os.remove(_totals_path(partition))
+
+    for path in (ATTENDANCE_FILE, ATTENDANCE_JOURNAL_FILE):
+        if os.path.exists(path):
+            os.replace(path, path + ".migrated")
+
+    return len(legacy.records)
+
+
+def migrate_partitions():
+    """Rewrite every partition snapshot, with its journal folded in, as day ordinals and epoch seconds.
+
+    A one-shot conversion of partitions written with formatted date/time
+    strings; those are still read as they are. Returns the number of
+    records written.
+    """
+    migrate_attendance_file()
+    count = 0
+    for partition in list_partitions():
+        with totals_lock([partition]):
+            compact_partition(partition, rewrite=True)
+        count += len(_load_snapshot(partition)[0])
+    return count
+
+
+def _current_event(event):
+    # Journals written before timestamps were stored as integers
+    return upgrade_attendance(event) if "date" in event else event
+
+
+def _save_totals(partition, totals):
+    save_data(_totals_path(partition),
+              {str(emp_id): [round(t[0], 6), round(t[1], 6), t[2]] for emp_id, t in totals.items()})
+
+
+def compute_totals(partition):
+    """Monthly totals of a partition recomputed from its records"""
+    return summarize_hours(AttendanceStore.load([partition]).records)
+
+
+def load_totals(partition):
+    """Materialized monthly totals of a partition: {emp_id: [regular, overtime, days present]}.
+
+    Built from the records the first time a partition is read, under
+    totals_lock, so a writer's update cannot be saved over with totals
+    computed before it.
+    """
+    if not os.path.exists(_totals_path(partition)):
+        with totals_lock([partition]):
+            return _materialize_totals(partition)
+    return _read_totals(partition)
+
+
+def _materialize_totals(partition):
+    """load_totals for callers already holding totals_lock for the partition"""
+    if os.path.exists(_totals_path(partition)):
+        return _read_totals(partition)
+    totals = compute_totals(partition)
+    if totals:
+        _save_totals(partition, totals)
+    return totals
+
+
+def _read_totals(partition):
+    # Copied: update_totals adds to them, and load_data's result is shared
+    return {int(emp_id): list(t) for emp_id, t in load_data(_totals_path(partition)).items()}
+
+
+def update_totals(deltas):
+    """Add {(partition, emp_id): [regular, overtime, days]} deltas to the materialized totals.
+
+    Callers hold totals_lock for the partitions, from the journal append
+    the deltas come from until this returns.
+    """
+    by_partition = {}
+    for (partition, emp_id), delta in deltas.items():
+        by_partition.setdefault(partition, {})[emp_id] = delta
+
+    for partition, partition_deltas in by_partition.items():
+        if not os.path.exists(_totals_path(partition)):
+            # Not materialized yet: the journal already holds these events
+            _materialize_totals(partition)
+            continue
+        totals = _read_totals(partition)
+        for emp_id, delta in partition_deltas.items():
+            emp_totals = totals.setdefault(emp_id, [0.0, 0.0, 0])
+            for i in range(3):
+                emp_totals[i] += delta[i]
+        _save_totals(partition, totals)
+
+
+def rebuild_totals(partitions=None, compute=compute_totals):
+    """Recompute the materialized totals from the records; compute(partition) gives a
+    partition's actual totals.
+
+    Returns the (partition, emp_id, stored, actual) entries that did not match.
+    """
+    mismatches = []
+    for partition in partitions if partitions is not None else list_partitions():
+        if partition is None:
+            continue
+        with totals_lock([partition]):
+            actual = compute(partition)
+            if not os.path.exists(_totals_path(partition)):
+                # Never materialized, nothing to check
+                _save_totals(partition, actual)
+                continue
+            stored = _read_totals(partition)
+            for emp_id in sorted(set(stored) | set(actual)):
+                if not _same_totals(stored.get(emp_id), actual.get(emp_id)):
+                    mismatches.append((partition, emp_id, stored.get(emp_id), actual.get(emp_id)))
+            _save_totals(partition, actual)
+    return mismatches
+
+
+def _same_totals(stored, actual):
+    if stored is None or actual is None:
+        return stored == actual
+    return all(abs(a - b) < 1e-6 for a, b in zip(stored, actual))
+
+
+def sessions_from_records(records):
+    """Open-session entries, {emp_id: (day, sign-in or None)}, for one day's records"""
+    sessions = {}
+    for record in records:
+        entry = sessions.get(record.emp_id)
+        if entry is None or (entry[1] is None and record.sign_out is None):
+            sessions[record.emp_id] = (record.day, record.sign_in if record.sign_out is None else None)
+    return sessions
+
+
+def sessions_lock():
+    """Hold the open-session table's lock"""
+    return _file_lock(OPEN_SESSIONS_FILE + ".lock")
+
+
+def _read_sessions():
+    """The stored open-session table, or None if there is none (or it is unreadable)"""
+    if not os.path.exists(OPEN_SESSIONS_FILE):
+        return None
+    data = load_data(OPEN_SESSIONS_FILE)
+    if not isinstance(data, dict):
+        return None
+    return {int(emp_id): tuple(entry) for emp_id, entry in data.items()}
+
+
+def load_sessions():
+    """The open-session table: {emp_id: (day, sign-in epoch seconds, or None once signed out)}
+    for everyone who punched today. Entries from an earlier day are stale.
+
+    Built from today's attendance the first time it is needed.
+    """
+    sessions = _read_sessions()
+    if sessions is None:
+        with sessions_lock():
+            sessions = read_sessions()
+    return sessions
+
+
+def read_sessions():
+    """load_sessions for callers already holding sessions_lock"""
+    sessions = _read_sessions()
+    if sessions is None:
+        sessions = merge_sessions({})
+    return sessions
+
+
+def update_sessions(updates):
+    """Merge {emp_id: (day, sign-in or None)} into the open-session table.
+
+    Only today's entries are kept; the rest are dropped, from the table too.
+    """
+    today = epoch_day(now_epoch())
+    updates = {emp_id: entry for emp_id, entry in updates.items() if entry[0] == today}
+    if not updates and os.path.exists(OPEN_SESSIONS_FILE):
+        return
+    with sessions_lock():
+        merge_sessions(updates)
+
+
+def merge_sessions(updates):
+    """update_sessions for callers already holding sessions_lock; returns the table as saved"""
+    today = epoch_day(now_epoch())
+    sessions = _read_sessions()
+    if sessions is None:
+        sessions = sessions_from_records(AttendanceStore.load([partition_for_day(today)]).for_day(today))
+    sessions.update(updates)
+    sessions = {emp_id: entry for emp_id, entry in sessions.items() if entry[0] == today}
+    save_data(OPEN_SESSIONS_FILE, {str(emp_id): list(entry) for emp_id, entry in sessions.items()})
+    return sessions
+
+
+class OpenSessions:
+    """The open-session table with the find_open/stage/commit interface of AttendanceStore,
+    for sign_in and sign_out events: a punch reads this instead of the attendance history.
+
+    Committed events go to journal and aggregate, under lock, as with
+    AttendanceStore, and the changed entries to save, the backend's update of
+    the stored table. Punches are checked and committed inside the backend's
+    punch_sessions(), which keeps the table locked from the read to the
+    commit.
+    """
+
+    def __init__(self, sessions, journal=None, aggregate=None, save=None, lock=None):
+        self.sessions = sessions
+        self.journal = journal
+        self.aggregate = aggregate
+        self.save = save
+        self.lock = lock
+        self._staged = []
+        self._deltas = {}
+        self._updates = {}
+
+    def find_open(self, emp_id, day):
+        """The open sign-in of an employee on a day (ordinal) as an AttendanceRecord, or None"""
+        entry = self.sessions.get(emp_id)
+        if entry is None or entry[0] != day or entry[1] is None:
+            return None
+        return AttendanceRecord(emp_id, day, entry[1])
+
+    def on_site(self, day):
+        """{emp_id: sign-in time} of everyone signed in on a day (ordinal) and not signed out"""
+        return {emp_id: sign_in for emp_id, (entry_day, sign_in) in self.sessions.items()
+                if entry_day == day and sign_in is not None}
+
+    def record(self, event):
+        """Apply a sign_in or sign_out event and persist it"""
+        self.stage(event)
+        self.commit()
+
+    def stage(self, event):
+        """Apply a sign_in or sign_out event to the table and hold it for the next commit();
+        returns the employee's new entry, or None if a sign_out had nothing to close"""
+        emp_id, day = event["emp_id"], event["day"]
+        entry = self.sessions.get(emp_id)
+        if event["op"] == "sign_in":
+            regular, overtime = 0.0, 0.0
+            new_day = entry is None or entry[0] != day
+            self.sessions[emp_id] = (day, event["sign_in"])
+        elif event["op"] == "sign_out":
+            if self.find_open(emp_id, day) is None:
+                return None
+            regular, overtime = split_hours(event["hours"])
+            new_day = False
+            self.sessions[emp_id] = (day, None)
+        else:
+            raise ValueError(f"Open sessions only take sign_in and sign_out events, not {event['op']}")
+
+        delta = self._deltas.setdefault((partition_for_day(day), emp_id), [0.0, 0.0, 0])
+        delta[0] += regular
+        delta[1] += overtime
+        delta[2] += new_day
+        self._updates[emp_id] = self.sessions[emp_id]
+        self._staged.append(event)
+        return self.sessions[emp_id]
+
+    def commit(self):
+        """Persist the staged events, their change to the monthly totals and to the table"""
+        events, deltas, updates = self._staged, self._deltas, self._updates
+        self._staged, self._deltas, self._updates = [], {}, {}
+        if not events:
+            return
+        with self.lock({partition for partition, _ in deltas}) if self.lock else nullcontext():
+            if self.journal:
+                self.journal(events)
+            if self.aggregate:
+                self.aggregate(deltas)
+        if self.save:
+            self.save(updates)
+
+
+class AttendanceStore:
+    """AttendanceRecord objects with hash indexes by (emp_id, day), by day and by employee.
+
+    Events passed to record() or record_many() (or stage() then commit())
+    are applied in memory and handed as a list to journal, the storage
+    backend's persistence callback. The resulting change to the monthly
+    totals, {(partition, emp_id): [regular, overtime, days]}, is then handed
+    to aggregate, and to the open-session table, {emp_id: (day, sign-in or
+    None)}, to sessions. If given, lock(partitions) is held around journal
+    and aggregate so other writers' updates are not lost.
+    """
+
+    def __init__(self, records=None, journal=None, aggregate=None, sessions=None, lock=None):
+        self.journal = journal
+        self.aggregate = aggregate
+        self.sessions = sessions
+        self.lock = lock
+        self.records = []
+        self._by_key = {}
+        self._by_day = {}
+        self._by_emp = {}
+        self._staged = []
+        self._deltas = {}
+        self._session_updates = {}
+        for record in records or []:
+            self._add(record)
+
+    def columns(self):
+        """The records as AttendanceColumns"""
+        return AttendanceColumns.from_records(self.records)
+
+    @classmethod
+    def load(cls, partitions=None):
+        """Build the attendance view for the given month partitions (all when None).
+
+        Each partition is its YYYY-MM.json snapshot with only the journal
+        past the snapshot's log offset replayed on top.
+        """
+        migrated = migrate_attendance_file()
+        if migrated:
+            print(f"Migrated {migrated} attendance records into {ATTENDANCE_DIR}/")
+
+        if partitions is None:
+            partitions = list_partitions()
+
+        store = cls(journal=append_to_partitions, aggregate=update_totals, sessions=update_sessions,
+                    lock=totals_lock)
+        with stage("attendance.load"):
+            for partition in partitions:
+                if partition is not None:
+                    store._load_partition(partition)
+        count("attendance records", len(store.records))
+        return store
+
+    def _load_partition(self, partition, active_journal=True):
+        records, offset = _load_snapshot(partition)
+        for record in records:
+            self._add(AttendanceRecord.from_dict(record))
+        journals = [path for start, path in _sealed_segments(partition) if start >= offset]
+        if active_journal:
+            journals.append(_journal_path(partition))
+        for path in journals:
+            for event in load_journal(path):
+                self.apply(_current_event(event))
+
+    def _add(self, record):
+        self.records.append(record)
+        self._by_key.setdefault((record.emp_id, record.day), []).append(record)
+        self._by_day.setdefault(record.day, []).append(record)
+        self._by_emp.setdefault(record.emp_id, []).append(record)
+        return record, None
+
+    def find(self, emp_id, day):
+        """First record of an employee on a day (ordinal), or None"""
+        records = self._by_key.get((emp_id, day))
+        return records[0] if records else None
+
+    def find_open(self, emp_id, day):
+        """Record of an employee on a day (ordinal) that has no sign-out yet, or None"""
+        for record in self._by_key.get((emp_id, day), ()):
+            if record.sign_out is None:
+                return record
+        return None
+
+    def for_day(self, day):
+        """All records for a day (ordinal)"""
+        return self._by_day.get(day, [])
+
+    def for_employee(self, emp_id):
+        """All records of an employee"""
+        return self._by_emp.get(emp_id, [])
+
+    def apply(self, event):
+        """Apply a sign_in, sign_out, edit or add (complete record) event to the records and indexes.
+
+        Returns (record, previous hours): the record touched, with previous
+        hours None when it is new, or (None, None) if nothing matched.
+        """
+        op = event.get("op")
+        if op == "add":
+            return self._add(AttendanceRecord(event["emp_id"], event["day"], event["sign_in"],
+                                              event["sign_out"], event["hours"]))
+        elif op == "sign_in":
+            return self._add(AttendanceRecord(event["emp_id"], event["day"], event["sign_in"]))
+        elif op == "sign_out":
+            entry = self.find_open(event["emp_id"], event["day"])
+            if entry:
+                previous = entry.hours
+                entry.sign_out = event["sign_out"]
+                entry.hours = event["hours"]
+                return entry, previous
+        elif op == "edit":
+            entry = self.find(event["emp_id"], event["day"])
+            if entry:
+                previous = entry.hours
+                entry.sign_in = event["sign_in"]
+                entry.sign_out = event["sign_out"]
+                entry.hours = event["hours"]
+                return entry, previous
+        return None, None
+
+    def record(self, event):
+        """Apply an event and persist it through the journal callback"""
+        self.record_many([event])
+
+    def record_many(self, events):
+        """Apply events and persist them, and their change to the monthly totals, in one batch"""
+        for event in events:
+            self.stage(event)
+        self.commit()
+
+    def stage(self, event):
+        """Apply an event in memory and hold it for the next commit(); returns the record touched or None"""
+        new_day = self.find(event["emp_id"], event["day"]) is None
+        entry, previous = self.apply(event)
+        if entry is None:
+            return None
+
+        delta = self._deltas.setdefault((partition_for_day(entry.day), entry.emp_id), [0.0, 0.0, 0])
+        regular, overtime = split_hours(entry.hours)
+        if previous is None:
+            delta[2] += new_day
+        else:
+            previous_regular, previous_overtime = split_hours(previous)
+            regular -= previous_regular
+            overtime -= previous_overtime
+        delta[0] += regular
+        delta[1] += overtime
+
+        open_entry = self.find_open(entry.emp_id, entry.day)
+        self._session_updates[entry.emp_id, entry.day] = open_entry.sign_in if open_entry else None
+        self._staged.append(event)
+        return entry
+
+    def commit(self):
+        """Persist the staged events, and their change to the monthly totals and open sessions, in one batch"""
+        events, deltas, updates = self._staged, self._deltas, self._session_updates
+        self._staged, self._deltas, self._session_updates = [], {}, {}
+        if not events:
+            return
+        # Totals and sessions follow the journal, so they can be rebuilt from it
+        with self.lock({partition for partition, _ in deltas}) if self.lock else nullcontext():
+            if self.journal:
+                self.journal(events)
+            if self.aggregate:
+                self.aggregate(deltas)
+        if self.sessions:
+            today = epoch_day(now_epoch())
+            self.sessions({emp_id: (day, sign_in) for (emp_id, day), sign_in in updates.items() if day == today})
@@ -1,18 +1,199 @@
 import json
+import marshal
+import os
+import threading
+from collections import OrderedDict
+from utils.profiling import stage, count
+from config import DATA_FORMAT, DATA_CACHE_BYTES
 
-def load_data(filename):
-    """Load data from JSON file"""
-    try:
-        with open(filename, "r") as file:
-            return json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError):
+# Formats save_data can write (config.DATA_FORMAT); load_data reads any of them
+DATA_FORMATS = ("pretty", "json", "jsonl", "marshal", "msgpack")
+
+# Binary formats start with a header so load_data can tell them from JSON
+_MAGIC = {"marshal": b"QHMARSHAL1\n", "msgpack": b"QHMSGPACK1\n"}
+
+_compact_json = json.JSONEncoder(separators=(",", ":")).encode
+
+# msgpack is optional and imported on first use; False when not installed
+_msgpack = None
+
+# Parsed data files by absolute path -> (file stamp, data, file size), least recently used first
+_cache = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+
+def _load_msgpack():
+    global _msgpack
+    if _msgpack is None:
+        try:
+            import msgpack
+            _msgpack = msgpack
+        except ImportError:
+            _msgpack = False
+    return _msgpack
+
+
+def encode(data, data_format=None):
+    """
+    Serialize data as one of DATA_FORMATS (config.DATA_FORMAT by default).
+    
+    jsonl writes a list one item per line (anything else as compact JSON);
+    msgpack raises RuntimeError when it is not installed.
+    """
+    data_format = data_format or DATA_FORMAT
+    if data_format == "msgpack" and not _load_msgpack():
+        raise RuntimeError("Saving as msgpack needs it installed: pip install msgpack "
+                           "(or set another DATA_FORMAT in config.py)")
+
+    if data_format == "pretty":
+        return json.dumps(data, indent=4).encode()
+    elif data_format == "json" or (data_format == "jsonl" and not isinstance(data, list)):
+        return _compact_json(data).encode()
+    elif data_format == "jsonl":
+        return "".join(_compact_json(item) + "\n" for item in data).encode()
+    elif data_format == "marshal":
+        return _MAGIC["marshal"] + marshal.dumps(data)
+    elif data_format == "msgpack":
+        return _MAGIC["msgpack"] + _msgpack.packb(data)
+    raise ValueError(f"Unknown data format: {data_format}")
+
+
+def decode(raw):
+    """Deserialize bytes written by encode() in any format, or a hand-written JSON file"""
+    if raw.startswith(_MAGIC["marshal"]):
+        return marshal.loads(raw[len(_MAGIC["marshal"]):])
+    if raw.startswith(_MAGIC["msgpack"]):
+        if not _load_msgpack():
+            raise RuntimeError("This file was saved as msgpack; install it with: pip install msgpack")
+        return _msgpack.unpackb(raw[len(_MAGIC["msgpack"]):], strict_map_key=False)
+
+    text = raw.decode("utf-8")
+    if not text.strip():
         return []
+    first, newline, rest = text.partition("\n")
+    if newline:
+        # JSON Lines: the first line is a whole value on its own, which it never is in indented
+        # JSON. encode() writes anything but a list without a trailing newline, so a single line
+        # ending in one is a one-item list.
+        try:
+            item = json.loads(first)
+        except json.JSONDecodeError:
+            pass
+        else:
+            return [item] + [json.loads(line) for line in rest.splitlines() if line.strip()]
+    return json.loads(text)
+
+
+def _stamp(stat):
+    # Saves rename a new file over the old one, so the inode changes even within one mtime tick
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _cache_put(path, stamp, data, size):
+    global _cache_bytes
+    with _cache_lock:
+        _cache_drop(path)
+        if size > DATA_CACHE_BYTES:
+            return
+        _cache[path] = (stamp, data, size)
+        _cache_bytes += size
+        while _cache_bytes > DATA_CACHE_BYTES:
+            _, (_, _, evicted) = _cache.popitem(last=False)
+            _cache_bytes -= evicted
+
+
+def _cache_drop(path):
+    global _cache_bytes
+    entry = _cache.pop(path, None)
+    if entry is not None:
+        _cache_bytes -= entry[2]
+
+
+def clear_cache():
+    """Forget every parsed file held by load_data"""
+    global _cache_bytes
+    with _cache_lock:
+        _cache.clear()
+        _cache_bytes = 0
+
+
+def load_data(filename):
+    """
+    Load data from a file saved in any of DATA_FORMATS.
+    
+    Parsed files are kept (up to config.DATA_CACHE_BYTES) and returned again
+    while the file's inode, mtime and size are unchanged, so the result is
+    shared between callers and must not be modified; save_data a new object.
+    """
+    path = os.path.abspath(filename)
+    with stage("storage.load"):
+        try:
+            with open(filename, "rb") as file:
+                stamp = _stamp(os.fstat(file.fileno()))
+                with _cache_lock:
+                    entry = _cache.get(path)
+                    if entry is not None and entry[0] == stamp:
+                        _cache.move_to_end(path)
+                        count("cache hits")
+                        return entry[1]
+                raw = file.read()
+            count("bytes read", len(raw))
+            data = decode(raw)
+        except FileNotFoundError:
+            with _cache_lock:
+                _cache_drop(path)
+            return []
+        except (ValueError, EOFError):
+            return []
+        _cache_put(path, stamp, data, len(raw))
+        return data
+
+
+def save_data(filename, data, data_format=None):
+    """Save data in config.DATA_FORMAT (or data_format), written to a temporary file and renamed
+    over it so readers never see half a file. data becomes load_data's cached copy, so it must
+    not be modified afterwards."""
+    with stage("storage.save"):
+        raw = encode(data, data_format)
+        count("bytes written", len(raw))
+        temp = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "wb") as file:
+            file.write(raw)
+            file.flush()
+            os.fsync(file.fileno())
+            # The stamp of this very file: renaming it keeps its inode and mtime
+            stamp = _stamp(os.fstat(file.fileno()))
+        os.replace(temp, filename)
+        _cache_put(os.path.abspath(filename), stamp, data, len(raw))
+
+
+def append_records(filename, records):
+    """Append records to a JSON Lines journal in one write, on disk before returning"""
+    with stage("storage.append"), open(filename, "a") as file:
+        file.write("".join(json.dumps(record) + "\n" for record in records))
+        file.flush()
+        os.fsync(file.fileno())
 
 
-def save_data(filename, data):
-    """Save data to JSON file"""
-    with open(filename, "w") as file:
-        json.dump(data, file, indent=4)
+def load_journal(filename):
+    """Load every record from a JSON Lines journal, oldest first"""
+    records = []
+    with stage("storage.journal"):
+        try:
+            with open(filename, "r") as file:
+                for line in file:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A punch interrupted mid-write leaves a torn last line
+                        continue
+        except FileNotFoundError:
+            pass
+    return records
 
 
 def get_next_employee_id(employees):
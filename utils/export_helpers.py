@@ -1,14 +1,32 @@
 from pathlib import Path
+from bisect import bisect_right
+from itertools import islice
 import csv
 import os
-from tkinter import Tk, filedialog
+from utils.profiling import stage
 
-try:
-    from reportlab.lib.pagesizes import landscape, letter
-    from reportlab.pdfgen import canvas
-    REPORTLAB_AVAILABLE = True
-except Exception:
-    REPORTLAB_AVAILABLE = False
+# tkinter and reportlab are imported on first use, so commands that never
+# export (sign-in at a kiosk, say) do not pay for loading them.
+REPORTLAB_AVAILABLE = None  # unknown until the first PDF export
+
+
+def _load_reportlab():
+    """Import reportlab on first use; returns whether it is installed"""
+    global REPORTLAB_AVAILABLE, landscape, letter, stringWidth, canvas
+    if REPORTLAB_AVAILABLE is None:
+        try:
+            from reportlab.lib.pagesizes import landscape, letter
+            from reportlab.pdfbase.pdfmetrics import stringWidth
+            from reportlab.pdfgen import canvas
+            REPORTLAB_AVAILABLE = True
+        except Exception:
+            REPORTLAB_AVAILABLE = False
+    return REPORTLAB_AVAILABLE
+
+
+# Rows handed to the csv writer per chunk, and the file buffer size
+CSV_CHUNK_ROWS = 1000
+CSV_BUFFER_BYTES = 1 << 16
 
 
 def _ensure_parent(path: str):
@@ -31,6 +49,8 @@ def get_save_location(default_filename: str, file_type: str = "CSV"):
     
     file_type: "CSV" or "PDF"
     """
+    from tkinter import Tk, filedialog
+
     root = Tk()
     root.withdraw()
     root.attributes('-topmost', True)
@@ -61,9 +81,12 @@ def get_save_location(default_filename: str, file_type: str = "CSV"):
     return filepath if filepath else None
 
 
-def save_csv(path: str, fieldnames: list, rows: list, use_dialog: bool = False):
+def save_csv(path: str, fieldnames: list, rows, use_dialog: bool = False):
     """
-    Save rows (list of dict) to CSV. Returns path.
+    Save rows (any iterable of dict, e.g. a generator) to CSV. Returns path.
+    
+    Rows are consumed and written CSV_CHUNK_ROWS at a time, so memory
+    stays bounded whatever the size of the report.
     
     If use_dialog=True, opens file dialog for user to choose location.
     Otherwise saves to specified path.
@@ -77,20 +100,24 @@ def save_csv(path: str, fieldnames: list, rows: list, use_dialog: bool = False):
         path = chosen_path
     
     _ensure_parent(path)
-    with open(path, "w", newline="", encoding="utf-8") as f:
+    rows = iter(rows)
+    with stage("render.csv"), open(path, "w", newline="", encoding="utf-8", buffering=CSV_BUFFER_BYTES) as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
-        for r in rows:
-            writer.writerow(r)
+        while True:
+            chunk = list(islice(rows, CSV_CHUNK_ROWS))
+            if not chunk:
+                break
+            writer.writerows(chunk)
     return path
 
 
-def save_text(path: str, title: str, lines: list):
-    """Save a simple text summary."""
+def save_text(path: str, title: str, lines):
+    """Save a simple text summary from any iterable of lines."""
     _ensure_parent(path)
     if not path.lower().endswith(".txt"):
         path = path + ".txt"
-    with open(path, "w", encoding="utf-8") as f:
+    with stage("render.text"), open(path, "w", encoding="utf-8") as f:
         f.write(title + "\n")
         f.write("=" * max(40, len(title)) + "\n\n")
         for ln in lines:
@@ -98,9 +125,76 @@ def save_text(path: str, title: str, lines: list):
     return path
 
 
-from reportlab.pdfbase.pdfmetrics import stringWidth
+# Cached glyph widths per (font_name, font_size)
+_GLYPH_WIDTHS = {}
+
 
-def save_pdf(path: str, title: str, lines: list, use_dialog: bool = False):
+def _glyph_widths(font_name: str, font_size: float):
+    widths = _GLYPH_WIDTHS.get((font_name, font_size))
+    if widths is None:
+        widths = _GLYPH_WIDTHS[(font_name, font_size)] = {}
+    return widths
+
+
+def _char_width(ch: str, widths: dict, font_name: str, font_size: float):
+    width = widths.get(ch)
+    if width is None:
+        width = widths[ch] = stringWidth(ch, font_name, font_size)
+    return width
+
+
+def _is_monospace(font_name: str, font_size: float):
+    widths = _glyph_widths(font_name, font_size)
+    return _char_width("i", widths, font_name, font_size) == _char_width("M", widths, font_name, font_size)
+
+
+def wrap_line(line: str, font_name: str, font_size: float, max_width: float):
+    """
+    Split a line into parts that each fit within max_width.
+    
+    Monospace fonts are cut by arithmetic on the fixed advance width;
+    proportional fonts (and glyphs a monospace font lacks, such as ₱ in
+    Courier) by bisecting the running sum of cached glyph widths.
+    Every part holds at least one character. Requires reportlab.
+    """
+    _load_reportlab()
+    widths = _glyph_widths(font_name, font_size)
+    advance = _char_width("M", widths, font_name, font_size)
+
+    if _is_monospace(font_name, font_size) and all(
+            _char_width(ch, widths, font_name, font_size) == advance for ch in set(line)):
+        per_line = max(1, int(max_width // advance))
+        if len(line) <= per_line:
+            return [line]
+        return [line[i:i + per_line] for i in range(0, len(line), per_line)]
+
+    offsets = [0.0]
+    for ch in line:
+        offsets.append(offsets[-1] + _char_width(ch, widths, font_name, font_size))
+
+    def fits(start, end):
+        estimate = offsets[end] - offsets[start]
+        if abs(estimate - max_width) > 1e-6:
+            return estimate <= max_width
+        # Too close to call on summed widths: settle it the way stringWidth rounds
+        return stringWidth(line[start:end], font_name, font_size) <= max_width
+
+    parts = []
+    start = 0
+    while not fits(start, len(line)):
+        end = bisect_right(offsets, offsets[start] + max_width) - 1
+        while end > start + 1 and not fits(start, end):
+            end -= 1
+        while end < len(line) and fits(start, end + 1):
+            end += 1
+        end = max(end, start + 1)
+        parts.append(line[start:end])
+        start = end
+    parts.append(line[start:])
+    return parts
+
+
+def save_pdf(path: str, title: str, lines, use_dialog: bool = False):
     if use_dialog:
         filename = Path(path).name
         chosen_path = get_save_location(filename, "PDF")
@@ -110,53 +204,45 @@ def save_pdf(path: str, title: str, lines: list, use_dialog: bool = False):
         path = chosen_path
 
     _ensure_parent(path)
-    if not REPORTLAB_AVAILABLE:
+    with stage("render.reportlab import"):
+        available = _load_reportlab()
+    if not available:
         if not path.lower().endswith(".txt"):
             path = path + ".txt"
         return save_text(path, title, lines)
 
-    c = canvas.Canvas(path, pagesize=landscape(letter))
-    width, height = landscape(letter)
-    margin = 36
-    y = height - margin
-
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(margin, y, title)
-    y -= 20
-
-    c.setFont("Courier", 10)
-    font_name = "Courier"
-    font_size = 10
-
-    max_width = width - (margin * 2) 
-
-    for line in lines:
-        while stringWidth(line, font_name, font_size) > max_width:
-            cut_index = len(line)
-
-            while stringWidth(line[:cut_index], font_name, font_size) > max_width:
-                cut_index -= 1
-
-            part = line[:cut_index]
-            c.drawString(margin, y, part)
-            y -= 12
-
-            line = line[cut_index:] 
-
-            if y < margin:
-                c.showPage()
-                y = height - margin
-                c.setFont(font_name, font_size)
-
-        c.drawString(margin, y, line)
-        y -= 12
-
-        if y < margin:
-            c.showPage()
-            y = height - margin
-            c.setFont(font_name, font_size)
-
-    c.save()
+    with stage("render.pdf"):
+        # Page setup is computed once and reused for every page
+        c = canvas.Canvas(path, pagesize=landscape(letter))
+        width, height = landscape(letter)
+        margin = 36
+        leading = 12
+        font_name = "Courier"
+        font_size = 10
+        max_width = width - (margin * 2)
+        y = height - margin
+
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(margin, y, title)
+        y -= 20
+
+        text = c.beginText(margin, y)
+        text.setFont(font_name, font_size, leading)
+
+        for line in lines:
+            for part in wrap_line(line, font_name, font_size, max_width):
+                text.textLine(part)
+                y -= leading
+
+                if y < margin:
+                    c.drawText(text)
+                    c.showPage()
+                    y = height - margin
+                    text = c.beginText(margin, y)
+                    text.setFont(font_name, font_size, leading)
+
+        c.drawText(text)
+        c.save()
     return path
 
 
@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+from config import PAYROLL_CACHE_DIR, PAYROLL_CACHE_ENTRIES
+
+
+def file_fingerprint(paths):
+    """Fingerprint of files from their (mtime_ns, size); a missing file counts as absent"""
+    parts = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            parts.append(f"{path}:{stat.st_mtime_ns}:{stat.st_size}")
+        except FileNotFoundError:
+            parts.append(f"{path}:-")
+    return "|".join(parts)
+
+
+def cache_key(*parts):
+    """Content address of a cached result: a hash of everything it was computed from"""
+    return hashlib.sha1("\n".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(PAYROLL_CACHE_DIR, f"{key}.json")
+
+
+def get_cached(key):
+    """Cached payroll for a key ({emp_id: pay data}), or None.
+
+    A hit touches the entry's mtime, which is what eviction orders by.
+    """
+    path = _entry_path(key)
+    try:
+        with open(path, "r") as file:
+            payroll = json.load(file)
+        os.utime(path)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return {int(emp_id): pay_data for emp_id, pay_data in payroll.items()}
+
+
+def store_cached(key, payroll):
+    """Cache a payroll result, evicting the least recently used entries beyond PAYROLL_CACHE_ENTRIES"""
+    os.makedirs(PAYROLL_CACHE_DIR, exist_ok=True)
+    # Written under a per-process temporary name so a reader never sees half an entry
+    temp_path = f"{_entry_path(key)}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as file:
+        # dumps() runs the C encoder; dump() would encode piecewise in Python
+        file.write(json.dumps(payroll, separators=(",", ":")))
+    os.replace(temp_path, _entry_path(key))
+
+    entries = []
+    for name in os.listdir(PAYROLL_CACHE_DIR):
+        if name.endswith(".json"):
+            path = os.path.join(PAYROLL_CACHE_DIR, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                pass  # evicted by another process meanwhile
+    entries.sort()
+    for _, path in entries[:-PAYROLL_CACHE_ENTRIES]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
\ No newline at end of file
@@ -0,0 +1,168 @@
+"""Stage timers and counters for --profile runs.
+
+Hot paths mark their work with `with stage("storage.load"):`, wrap lazy row
+and line generators in timed_iter(), and add to counters with count(). Until
+a session() turns profiling on, stage() hands back one shared no-op context
+and timed_iter() returns the iterable unchanged, so instrumented code costs a
+flag check per call and nothing per row.
+
+Stages nest: a stage's self time excludes the stages run inside it (a PDF
+render's self time is reportlab, not the rows it pulls). Worker processes of
+payroll-batch are not instrumented; their time shows up in the parent's stage.
+"""
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Allocation sites listed by --profile-memory, and functions by --profile-stats
+TOP_ENTRIES = 15
+
+_enabled = False
+_lock = threading.Lock()
+_local = threading.local()
+# stage name -> [calls, total seconds, seconds spent in stages nested inside it]
+_stages = {}
+_counters = {}
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(0.0)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = _local.stack
+        nested = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        with _lock:
+            entry = _stages.get(self.name)
+            if entry is None:
+                entry = _stages[self.name] = [0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] += nested
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name):
+    """Context manager timing a stage while profiling is on"""
+    return _Stage(name) if _enabled else _NO_STAGE
+
+
+def timed_iter(name, iterable):
+    """iterable, with the time spent producing each item counted as the stage name while profiling is on"""
+    if not _enabled:
+        return iterable
+    return _timed_iter(name, iter(iterable))
+
+
+def _timed_iter(name, iterator):
+    while True:
+        with _Stage(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def count(name, amount=1):
+    """Add to a counter while profiling is on"""
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + amount
+
+
+def print_report(wall, file=None):
+    """Print the per-stage breakdown of a run that took wall seconds"""
+    file = file or sys.stderr
+    print(f"\nProfile: {wall * 1000:.1f} ms wall", file=file)
+    print(f"{'stage':<28} {'calls':>8} {'total ms':>10} {'self ms':>10} {'self %':>7}", file=file)
+    by_self = sorted(_stages.items(), key=lambda item: item[1][1] - item[1][2], reverse=True)
+    for name, (calls, total, nested) in by_self:
+        own = total - nested
+        print(f"{name:<28} {calls:>8} {total * 1000:>10.1f} {own * 1000:>10.1f} "
+              f"{own / wall * 100 if wall else 0:>6.1f}%", file=file)
+    if _counters:
+        print(f"\n{'counter':<28} {'value':>14}", file=file)
+    for name, value in sorted(_counters.items()):
+        print(f"{name:<28} {value:>14,}", file=file)
+
+
+def add_arguments(parser):
+    """Add --profile, --profile-stats and --profile-memory to an argparse parser"""
+    parser.add_argument("--profile", action="store_true", help="print a per-stage time breakdown on exit")
+    parser.add_argument("--profile-stats", metavar="FILE",
+                        help="also run under cProfile, save the stats to FILE and print the top functions")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="also trace allocations and print the peak and the top allocation sites")
+
+
+@contextmanager
+def session(args):
+    """Profile the enclosed run as the --profile options in args ask; does nothing without them"""
+    global _enabled
+    if not (args.profile or args.profile_stats or args.profile_memory):
+        yield
+        return
+
+    profiler = None
+    if args.profile_stats:
+        import cProfile
+        profiler = cProfile.Profile()
+    if args.profile_memory:
+        import tracemalloc
+        tracemalloc.start()
+
+    _stages.clear()
+    _counters.clear()
+    _enabled = True
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+        wall = time.perf_counter() - start
+        _enabled = False
+        print_report(wall)
+
+        if profiler:
+            import pstats
+            profiler.dump_stats(args.profile_stats)
+            print(f"\ncProfile stats saved to {args.profile_stats}", file=sys.stderr)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(TOP_ENTRIES)
+
+        if args.profile_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ENTRIES]
+            tracemalloc.stop()
+            print(f"\nPeak traced memory: {peak / 1024 / 1024:.1f} MiB; largest live allocations:", file=sys.stderr)
+            for stat in top:
+                print(f"  {stat}", file=sys.stderr)
\ No newline at end of file
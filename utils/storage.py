@@ -0,0 +1,470 @@
+import os
+from contextlib import contextmanager
+from models import (Employee, AttendanceRecord, AttendanceColumns, date_ordinal, datetime_epoch, epoch_day,
+                    now_epoch)
+from utils.data_handler import load_data, save_data, get_next_employee_id
+from utils.attendance_store import (AttendanceStore, OpenSessions, partition_for_day, partition_for_month,
+                                    partition_files, _totals_path, load_totals, rebuild_totals,
+                                    migrate_partitions, compact_partitions, list_partitions,
+                                    append_to_partitions, update_totals, totals_lock, load_sessions,
+                                    read_sessions, update_sessions, merge_sessions, sessions_lock,
+                                    sessions_from_records, summarize_columns)
+from utils.attendance_archive import open_archive, partition_stamp, write_archive
+from utils.payroll_cache import file_fingerprint, cache_key
+from utils.profiling import stage
+from config import (STORAGE_BACKEND, SQLITE_FILE, EMPLOYEE_FILE, PAYROLL_INPUTS_FILE,
+                    ATTENDANCE_FILE, ATTENDANCE_JOURNAL_FILE, ATTENDANCE_ARCHIVE_FILE, REGULAR_HOURS_PER_DAY)
+
+EMPLOYEE_FIELDS = ("emp_id", "name", "role", "dept", "rate", "contact")
+PAYROLL_INPUT_FIELDS = ("emp_id", "month", "allowance", "deduction")
+
+_repository = None
+
+
+def open_repository():
+    """A new repository for the storage backend selected in config.STORAGE_BACKEND"""
+    if STORAGE_BACKEND == "sqlite":
+        return SqliteRepository(SQLITE_FILE)
+    elif STORAGE_BACKEND == "json":
+        return JsonRepository()
+    raise ValueError(f"Unknown storage backend: {STORAGE_BACKEND}")
+
+
+def get_repository():
+    """Return the shared repository for the storage backend selected in config.STORAGE_BACKEND"""
+    global _repository
+    if _repository is None:
+        _repository = open_repository()
+    return _repository
+
+
+class JsonRepository:
+    """Employees and payroll inputs in JSON files, attendance in month partitions"""
+
+    def load_employees(self):
+        return [Employee.from_dict(e) for e in load_data(EMPLOYEE_FILE)]
+
+    def _save_employees(self, employees):
+        save_data(EMPLOYEE_FILE, [e.to_dict() for e in employees])
+
+    def get_employee(self, emp_id):
+        return next((e for e in self.load_employees() if e.emp_id == emp_id), None)
+
+    def next_employee_id(self):
+        return get_next_employee_id(load_data(EMPLOYEE_FILE))
+
+    def add_employees(self, new_employees):
+        employees = self.load_employees()
+        employees.extend(new_employees)
+        self._save_employees(employees)
+
+    def update_employee(self, employee):
+        employees = self.load_employees()
+        for index, emp in enumerate(employees):
+            if emp.emp_id == employee.emp_id:
+                employees[index] = employee
+        self._save_employees(employees)
+
+    def delete_employee(self, emp_id):
+        self._save_employees([e for e in self.load_employees() if e.emp_id != emp_id])
+
+    def load_attendance(self, partitions=None):
+        return AttendanceStore.load(partitions)
+
+    def open_sessions(self):
+        """Who is clocked in, as OpenSessions; punches go through punch_sessions()"""
+        return OpenSessions(load_sessions(), journal=append_to_partitions, aggregate=update_totals,
+                            save=update_sessions, lock=totals_lock)
+
+    @contextmanager
+    def punch_sessions(self):
+        """OpenSessions for sign_in and sign_out, with the table locked until the block ends so
+        no other process can pass the same check before the punches are committed"""
+        with sessions_lock():
+            yield OpenSessions(read_sessions(), journal=append_to_partitions, aggregate=update_totals,
+                               save=merge_sessions, lock=totals_lock)
+
+    def load_attendance_columns(self, partitions=None):
+        """Attendance as AttendanceColumns; months current in the binary archive are sliced
+        from it instead of parsing their JSON"""
+        archive = open_archive(ATTENDANCE_ARCHIVE_FILE)
+        if archive is None:
+            return self.load_attendance(partitions).columns()
+        with archive, stage("attendance.archive"):
+            columns = AttendanceColumns()
+            for partition in partitions if partitions is not None else list_partitions():
+                if partition is None:
+                    continue
+                rows = (archive.month_rows(partition) if archive.is_current(partition)
+                        else self.load_attendance([partition]).columns())
+                for row in rows:
+                    columns.append(*row)
+            return columns
+
+    def load_employee_attendance(self, emp_id):
+        """One employee's AttendanceRecords, from the binary archive's employee index for
+        the months current in it"""
+        archive = open_archive(ATTENDANCE_ARCHIVE_FILE)
+        if archive is None:
+            return self.load_attendance().for_employee(emp_id)
+        with archive:
+            partitions = list_partitions()
+            current = {partition for partition in partitions if archive.is_current(partition)}
+            records = [AttendanceRecord(*row) for row in archive.employee_rows(emp_id)
+                       if partition_for_day(row[1]) in current]
+        stale = [partition for partition in partitions if partition not in current]
+        return records + self.load_attendance(stale).for_employee(emp_id)
+
+    def archive_attendance(self):
+        """Write every month's attendance to the binary archive.
+
+        Returns (months archived, months left out because an hours value has
+        more than two decimals).
+        """
+        partitions = {}
+        for partition in list_partitions():
+            # Stamped before reading, so a write in between leaves the month stale rather than wrong
+            stamp = partition_stamp(partition)
+            partitions[partition] = (stamp, self.load_attendance([partition]).columns())
+        skipped = write_archive(ATTENDANCE_ARCHIVE_FILE, partitions)
+        return len(partitions) - len(skipped), skipped
+
+    def month_hours(self, month):
+        partition = partition_for_month(month)
+        return load_totals(partition) if partition else {}
+
+    def rebuild_totals(self, months=None):
+        """Recompute the monthly totals, summing columns so archived months need no JSON parsing"""
+        partitions = None if months is None else [partition_for_month(m) for m in months]
+        return rebuild_totals(partitions,
+                              lambda partition: summarize_columns(self.load_attendance_columns([partition])))
+
+    def migrate_attendance(self):
+        return migrate_partitions()
+
+    def compact_attendance(self, months=None):
+        """Fold attendance journals into their snapshots; returns {partition: journal bytes folded}"""
+        return compact_partitions(None if months is None else [partition_for_month(m) for m in months])
+
+    def fingerprint(self, month):
+        """Changes whenever anything a month's payroll is computed from changes"""
+        files = [EMPLOYEE_FILE, PAYROLL_INPUTS_FILE, ATTENDANCE_FILE, ATTENDANCE_JOURNAL_FILE]
+        partition = partition_for_month(month)
+        if partition:
+            files += partition_files(partition) + [_totals_path(partition)]
+        return file_fingerprint(files)
+
+    def load_payroll_inputs(self):
+        if not os.path.exists(PAYROLL_INPUTS_FILE):
+            return None
+        return load_data(PAYROLL_INPUTS_FILE)
+
+    def save_payroll_inputs(self, payroll_inputs):
+        save_data(PAYROLL_INPUTS_FILE, payroll_inputs)
+
+
+class SqliteRepository:
+    """All data in one SQLite database, attendance indexed on (emp_id, day) and on month"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS employees (
+            emp_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            role TEXT,
+            dept TEXT,
+            rate REAL NOT NULL DEFAULT 0,
+            contact TEXT
+        );
+        CREATE TABLE IF NOT EXISTS attendance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            emp_id INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            sign_in INTEGER,
+            sign_out INTEGER,
+            hours REAL NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_attendance_emp_day ON attendance (emp_id, day);
+        CREATE INDEX IF NOT EXISTS idx_attendance_month ON attendance (month, emp_id);
+        CREATE TABLE IF NOT EXISTS monthly_totals (
+            month TEXT NOT NULL,
+            emp_id INTEGER NOT NULL,
+            regular REAL NOT NULL DEFAULT 0,
+            overtime REAL NOT NULL DEFAULT 0,
+            days INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, emp_id)
+        );
+        CREATE TABLE IF NOT EXISTS open_sessions (
+            emp_id INTEGER PRIMARY KEY,
+            day INTEGER NOT NULL,
+            sign_in INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS payroll_inputs (
+            emp_id INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            allowance REAL NOT NULL DEFAULT 0,
+            deduction REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (emp_id, month)
+        );
+    """
+
+    def __init__(self, path):
+        import sqlite3
+
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.migrated = self._migrate_text_attendance()
+        new_sessions = not self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'open_sessions'").fetchone()
+        self.conn.executescript(self.SCHEMA)
+
+        # Databases from before monthly_totals existed
+        if (self.conn.execute("SELECT EXISTS (SELECT 1 FROM attendance)").fetchone()[0]
+                and not self.conn.execute("SELECT EXISTS (SELECT 1 FROM monthly_totals)").fetchone()[0]):
+            self.rebuild_totals()
+        # Databases from before open_sessions existed
+        if new_sessions:
+            today = epoch_day(now_epoch())
+            today_records = self.load_attendance([partition_for_day(today)]).for_day(today)
+            self.update_sessions(sessions_from_records(today_records))
+
+    def _migrate_text_attendance(self):
+        """Convert attendance stored with MM-DD-YYYY dates and formatted times to
+        day ordinals and epoch seconds; returns the number of rows converted"""
+        tables = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "attendance_text" not in tables:
+            if "attendance" not in tables:
+                return 0
+            if "date" not in {row[1] for row in self.conn.execute("PRAGMA table_info(attendance)")}:
+                return 0
+            with self.conn:
+                self.conn.execute("ALTER TABLE attendance RENAME TO attendance_text")
+                self.conn.execute("DROP INDEX IF EXISTS idx_attendance_emp_date")
+                self.conn.execute("DROP INDEX IF EXISTS idx_attendance_month")
+
+        # Picks up a conversion that was interrupted after the rename
+        self.conn.executescript(self.SCHEMA)
+        rows = []
+        for row_id, emp_id, date_str, sign_in, sign_out, hours in self.conn.execute(
+                "SELECT id, emp_id, date, sign_in, sign_out, hours FROM attendance_text ORDER BY id"):
+            day = date_ordinal(date_str)
+            rows.append((row_id, emp_id, day, partition_for_day(day),
+                         datetime_epoch(sign_in), datetime_epoch(sign_out), hours))
+        with self.conn:
+            self.conn.execute("DELETE FROM attendance")
+            self.conn.executemany(
+                "INSERT INTO attendance (id, emp_id, day, month, sign_in, sign_out, hours) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.execute("DROP TABLE attendance_text")
+        return len(rows)
+
+    def migrate_attendance(self):
+        """Rows converted to integer timestamps when the database was opened"""
+        migrated, self.migrated = self.migrated, 0
+        return migrated
+
+    def _rows(self, sql, params=(), make=None):
+        with stage("storage.query"):
+            cursor = self.conn.execute(sql, params)
+            return [make(*row) for row in cursor]
+
+    def load_employees(self):
+        return self._rows("SELECT emp_id, name, role, dept, rate, contact FROM employees ORDER BY emp_id",
+                          make=Employee)
+
+    def get_employee(self, emp_id):
+        rows = self._rows("SELECT emp_id, name, role, dept, rate, contact FROM employees WHERE emp_id = ?",
+                          (emp_id,), Employee)
+        return rows[0] if rows else None
+
+    def next_employee_id(self):
+        return self.conn.execute("SELECT COALESCE(MAX(emp_id), 0) + 1 FROM employees").fetchone()[0]
+
+    def add_employees(self, new_employees):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO employees (emp_id, name, role, dept, rate, contact) VALUES (?, ?, ?, ?, ?, ?)",
+                [tuple(getattr(emp, field) for field in EMPLOYEE_FIELDS) for emp in new_employees])
+
+    def update_employee(self, employee):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE employees SET name = ?, role = ?, dept = ?, rate = ?, contact = ? WHERE emp_id = ?",
+                tuple(getattr(employee, field) for field in EMPLOYEE_FIELDS[1:]) + (employee.emp_id,))
+
+    def delete_employee(self, emp_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM employees WHERE emp_id = ?", (emp_id,))
+
+    def _attendance_query(self, partitions):
+        sql = "SELECT emp_id, day, sign_in, sign_out, hours FROM attendance"
+        params = ()
+        if partitions is not None:
+            params = tuple(p for p in partitions if p is not None)
+            sql += f" WHERE month IN ({', '.join('?' for _ in params)})"
+        return sql + " ORDER BY id", params
+
+    def load_attendance(self, partitions=None):
+        return AttendanceStore(self._rows(*self._attendance_query(partitions), AttendanceRecord),
+                               journal=self.record_attendance, aggregate=self.update_totals,
+                               sessions=self.update_sessions)
+
+    def open_sessions(self):
+        """Who is clocked in, as OpenSessions; punches go through punch_sessions()"""
+        return OpenSessions(self._read_sessions(), journal=self.record_attendance, aggregate=self.update_totals,
+                            save=self.update_sessions)
+
+    @contextmanager
+    def punch_sessions(self):
+        """OpenSessions for sign_in and sign_out, read and committed in one BEGIN IMMEDIATE
+        transaction so no other connection can pass the same check in between"""
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            yield OpenSessions(self._read_sessions(), journal=self._record_events, aggregate=self._add_totals,
+                               save=self._merge_sessions)
+
+    def _read_sessions(self):
+        return {emp_id: (day, sign_in) for emp_id, day, sign_in in
+                self.conn.execute("SELECT emp_id, day, sign_in FROM open_sessions")}
+
+    def load_attendance_columns(self, partitions=None):
+        """Attendance straight from the cursor into AttendanceColumns, with no per-row objects kept"""
+        columns = AttendanceColumns()
+        with stage("storage.query"):
+            for row in self.conn.execute(*self._attendance_query(partitions)):
+                columns.append(*row)
+        return columns
+
+    def load_employee_attendance(self, emp_id):
+        return self._rows("SELECT emp_id, day, sign_in, sign_out, hours FROM attendance "
+                          "WHERE emp_id = ? ORDER BY id", (emp_id,), AttendanceRecord)
+
+    def archive_attendance(self):
+        """Attendance in SQLite is already indexed by employee and month; nothing to archive"""
+        return 0, []
+
+    def record_attendance(self, events):
+        """Persist sign_in, sign_out, edit and add events in one transaction"""
+        with self.conn:
+            self._record_events(events)
+
+    def _record_events(self, events):
+        with stage("storage.save"):
+            for event in events:
+                self._record_event(event)
+
+    def _record_event(self, event):
+        op = event.get("op")
+        if op == "add":
+            self.conn.execute(
+                "INSERT INTO attendance (emp_id, day, month, sign_in, sign_out, hours) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (event["emp_id"], event["day"], partition_for_day(event["day"]),
+                 event["sign_in"], event["sign_out"], event["hours"]))
+        elif op == "sign_in":
+            self.conn.execute(
+                "INSERT INTO attendance (emp_id, day, month, sign_in, sign_out, hours) "
+                "VALUES (?, ?, ?, ?, NULL, 0)",
+                (event["emp_id"], event["day"], partition_for_day(event["day"]), event["sign_in"]))
+        elif op == "sign_out":
+            self.conn.execute(
+                "UPDATE attendance SET sign_out = ?, hours = ? WHERE id = ("
+                "SELECT id FROM attendance WHERE emp_id = ? AND day = ? "
+                "AND sign_out IS NULL ORDER BY id LIMIT 1)",
+                (event["sign_out"], event["hours"], event["emp_id"], event["day"]))
+        elif op == "edit":
+            self.conn.execute(
+                "UPDATE attendance SET sign_in = ?, sign_out = ?, hours = ? WHERE id = ("
+                "SELECT id FROM attendance WHERE emp_id = ? AND day = ? ORDER BY id LIMIT 1)",
+                (event["sign_in"], event["sign_out"], event["hours"], event["emp_id"], event["day"]))
+
+    def update_totals(self, deltas):
+        """Add {(partition, emp_id): [regular, overtime, days]} deltas to monthly_totals"""
+        with self.conn:
+            self._add_totals(deltas)
+
+    def _add_totals(self, deltas):
+        with stage("storage.save"):
+            self.conn.executemany(
+                "INSERT INTO monthly_totals (month, emp_id, regular, overtime, days) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (month, emp_id) DO UPDATE SET "
+                "regular = ROUND(regular + excluded.regular, 6), "
+                "overtime = ROUND(overtime + excluded.overtime, 6), "
+                "days = days + excluded.days",
+                [(partition, emp_id, regular, overtime, days)
+                 for (partition, emp_id), (regular, overtime, days) in deltas.items()])
+
+    def update_sessions(self, updates):
+        """Merge {emp_id: (day, sign-in or None)} into open_sessions; only today's entries are kept"""
+        with self.conn:
+            self._merge_sessions(updates)
+
+    def _merge_sessions(self, updates):
+        today = epoch_day(now_epoch())
+        with stage("storage.save"):
+            self.conn.executemany(
+                "INSERT INTO open_sessions (emp_id, day, sign_in) VALUES (?, ?, ?) "
+                "ON CONFLICT (emp_id) DO UPDATE SET day = excluded.day, sign_in = excluded.sign_in",
+                [(emp_id, day, sign_in) for emp_id, (day, sign_in) in updates.items() if day == today])
+            self.conn.execute("DELETE FROM open_sessions WHERE day != ?", (today,))
+
+    def month_hours(self, month):
+        cursor = self.conn.execute(
+            "SELECT emp_id, regular, overtime, days FROM monthly_totals WHERE month = ?",
+            (partition_for_month(month),))
+        return {emp_id: [regular, overtime, days] for emp_id, regular, overtime, days in cursor}
+
+    def rebuild_totals(self, months=None):
+        """Recompute monthly_totals from attendance; returns the (partition, emp_id, stored, actual) mismatches"""
+        where, params = "", ()
+        if months is not None:
+            params = tuple(partition_for_month(m) for m in months)
+            where = f" WHERE month IN ({', '.join('?' for _ in params)})"
+
+        stored = {(row[0], row[1]): list(row[2:]) for row in self.conn.execute(
+            "SELECT month, emp_id, regular, overtime, days FROM monthly_totals" + where, params)}
+        actual = {(row[0], row[1]): list(row[2:]) for row in self.conn.execute(
+            "SELECT month, emp_id, ROUND(SUM(MIN(hours, ?)), 6), ROUND(SUM(MAX(hours - ?, 0)), 6), "
+            "COUNT(DISTINCT day) FROM attendance" + where + " GROUP BY month, emp_id",
+            (REGULAR_HOURS_PER_DAY, REGULAR_HOURS_PER_DAY) + params)}
+
+        mismatches = []
+        for partition, emp_id in sorted(set(stored) | set(actual)):
+            before, after = stored.get((partition, emp_id)), actual.get((partition, emp_id))
+            if before is None or after is None or any(abs(a - b) >= 1e-6 for a, b in zip(before, after)):
+                mismatches.append((partition, emp_id, before, after))
+
+        with self.conn:
+            self.conn.execute("DELETE FROM monthly_totals" + where, params)
+            self.conn.executemany(
+                "INSERT INTO monthly_totals (month, emp_id, regular, overtime, days) VALUES (?, ?, ?, ?, ?)",
+                [key + tuple(totals) for key, totals in actual.items()])
+        return mismatches
+
+    def compact_attendance(self, months=None):
+        """Checkpoint the write-ahead log into the database and truncate it; returns {"wal": bytes folded}"""
+        wal = self.path + "-wal"
+        size = os.path.getsize(wal) if os.path.exists(wal) else 0
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return {"wal": size}
+
+    def fingerprint(self, month):
+        """Changes whenever the database (or its write-ahead log) is written, or the month's totals change"""
+        totals = self.conn.execute(
+            "SELECT emp_id, regular, overtime, days FROM monthly_totals WHERE month = ? ORDER BY emp_id",
+            (partition_for_month(month),)).fetchall()
+        return file_fingerprint([self.path, self.path + "-wal"]) + "|" + cache_key(*totals)
+
+    def load_payroll_inputs(self):
+        rows = self._rows("SELECT emp_id, month, allowance, deduction FROM payroll_inputs",
+                          make=lambda *row: dict(zip(PAYROLL_INPUT_FIELDS, row)))
+        return rows or None
+
+    def save_payroll_inputs(self, payroll_inputs):
+        with self.conn:
+            self.conn.execute("DELETE FROM payroll_inputs")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO payroll_inputs (emp_id, month, allowance, deduction) VALUES (?, ?, ?, ?)",
+                [tuple(x[field] for field in PAYROLL_INPUT_FIELDS) for x in payroll_inputs])